@@ -1,5 +1,6 @@
+import sys
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 from typing import Optional
 
@@ -9,16 +10,24 @@ from tabulate import tabulate
 testing_mode: bool = False
 status: str = "Enabled" if testing_mode is True else "Disabled"
 monetary_hold: bool = True
-input(
-    f'\n\nTesting mode: {status}.\nMonetary hold: {monetary_hold}\n\nPress "Enter" to continue.\n\n'
-).strip()
+# Keeps a queryable SQLite copy of the archive in step with the JSONL archive.
+sqlite_archive: bool = False
+# Appends each batch's awards to the tracker workbook's log sheet.
+tracker_export: bool = False
+if sys.stdin is not None and sys.stdin.isatty():
+    input(
+        f'\n\nTesting mode: {status}.\nMonetary hold: {monetary_hold}\n\nPress "Enter" to continue.\n\n'
+    ).strip()
 
 today = datetime.today()
 
-if today.month >= 10:
-    current_fiscal_year = today.year + 1
-else:
-    current_fiscal_year = today.year
+
+def fiscal_year_of(day: date) -> int:
+    """Fiscal years start on Oct 1: 2024-10-01 falls in FY 2025."""
+    return day.year + 1 if day.month >= 10 else day.year
+
+
+current_fiscal_year = fiscal_year_of(today)
 
 
 _local_dir: Path = Path.cwd() / "awards"
@@ -27,22 +36,100 @@ _network_dir: Path = Path(
 )
 
 
+def _partition_dir(fiscal_year: int) -> Path:
+    return _local_dir / f"FY {fiscal_year}"
+
+
+def _tracker_path(fiscal_year: int) -> Path:
+    return Path(
+        r"C:\Users\joseph.strong\OneDrive - US Department of Energy"
+        f"\\FY {fiscal_year} _ Special Act Awards Log.xlsm"
+    )
+
+
 class PathManager:
+    """
+    Where everything lives. The archive, TSV, serial numbers and log-ID registry
+    are partitioned by fiscal year under awards/FY <year>/; use_fiscal_year()
+    re-points them, and rollover() does so when Oct 1 has passed.
+    """
+
+    local_dir: Path = _local_dir
+    fiscal_year: int = current_fiscal_year
+    partition_dir: Path = _partition_dir(current_fiscal_year)
     file_archive_dir: Path = (
         _network_dir
         / f"FY {current_fiscal_year}\\Archive _ SASA Nomination Form Submissions"
     )
+    extraction_cache_dir: Path = _local_dir / "_extraction_cache"
     field_name_data_path: Path = _local_dir / "field_name_data.json"
-    json_archive_path: Path = _local_dir / "_output_JSON.json"
+    json_archive_path: Path = partition_dir / "_output_JSON.json"
+    jsonl_archive_path: Path = partition_dir / "_output_JSON.jsonl"
+    jsonl_index_path: Path = partition_dir / "_output_JSON.idx"
+    journal_dir: Path = partition_dir / "_journal"
+    log_id_registry_path: Path = partition_dir / "_log_ids.txt"
     logger_path: Path = _local_dir / "_logger.log"
+    manifest_path: Path = _local_dir / "_manifest.json"
     manual_entry_path: Path = _local_dir / "_manual_entry.yaml"
-    serial_path: Path = _local_dir / "_serial_numbers.yaml"
-    tracker_path: Path = Path(
-        r"C:\Users\joseph.strong\OneDrive - US Department of Energy\FY 2025 _ Special Act Awards Log.xlsm"
+    review_queue_path: Path = _local_dir / "_review_queue.json"
+    serial_path: Path = partition_dir / "_serial_numbers.yaml"
+    sqlite_archive_path: Path = partition_dir / "_archive.sqlite3"
+    submissions_dir: Path = Path(
+        r"C:\Users\joseph.strong\OneDrive - US Department of Energy\Python\awards\_submissions"
     )
-    tsv_output_path: Path = _local_dir / "_output_TSV.txt"
+    tracker_path: Path = _tracker_path(current_fiscal_year)
+    tracker_pending_path: Path = partition_dir / "_tracker_pending.json"
+    tracker_sync_path: Path = partition_dir / "_tracker_sync.json"
+    tsv_output_path: Path = partition_dir / "_output_TSV.txt"
+
+    @classmethod
+    def partition(cls, fiscal_year: int) -> Path:
+        return cls.local_dir / f"FY {fiscal_year}"
+
+    @classmethod
+    def partitions(cls) -> dict[int, Path]:
+        """Every fiscal-year partition on disk, oldest first."""
+        found: dict[int, Path] = {}
+        for path in cls.local_dir.glob("FY *"):
+            year: str = path.name[3:]
+            if path.is_dir() and year.isdigit():
+                found[int(year)] = path
+        return dict(sorted(found.items()))
+
+    @classmethod
+    def use_fiscal_year(cls, fiscal_year: int) -> None:
+        partition_dir: Path = cls.partition(fiscal_year)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        cls.fiscal_year = fiscal_year
+        cls.partition_dir = partition_dir
+        cls.file_archive_dir = (
+            _network_dir
+            / f"FY {fiscal_year}\\Archive _ SASA Nomination Form Submissions"
+        )
+        cls.json_archive_path = partition_dir / "_output_JSON.json"
+        cls.jsonl_archive_path = partition_dir / "_output_JSON.jsonl"
+        cls.jsonl_index_path = partition_dir / "_output_JSON.idx"
+        cls.journal_dir = partition_dir / "_journal"
+        cls.log_id_registry_path = partition_dir / "_log_ids.txt"
+        cls.serial_path = partition_dir / "_serial_numbers.yaml"
+        cls.sqlite_archive_path = partition_dir / "_archive.sqlite3"
+        cls.tracker_path = _tracker_path(fiscal_year)
+        cls.tracker_pending_path = partition_dir / "_tracker_pending.json"
+        cls.tracker_sync_path = partition_dir / "_tracker_sync.json"
+        cls.tsv_output_path = partition_dir / "_output_TSV.txt"
+        AwardTracker.file_path = cls.tracker_path
+
+    @classmethod
+    def rollover(cls, day: Optional[date] = None) -> bool:
+        """Switches to the new fiscal year's partition once Oct 1 has passed."""
+        fiscal_year: int = fiscal_year_of(day or datetime.today())
+        if fiscal_year == cls.fiscal_year:
+            return False
+        cls.use_fiscal_year(fiscal_year)
+        return True
 
     def __init__(self):
+        self.partition_dir.mkdir(parents=True, exist_ok=True)
         paths_list: list[Path] = [
             self.json_archive_path,
             self.logger_path,
@@ -60,6 +147,8 @@ class AwardTracker:
     sheet_name: str = "data_entry"
     ind_coord: str = "C2"
     grp_coord: str = "C3"
+    log_sheet_name: str = "awards_log"
+    log_header_rows: int = 1
 
 
 ORGANIZATION_DIVISIONS: dict[str, list[str]] = {
@@ -169,7 +169,7 @@ class Formatter:
     def _format_lines(self, text: str) -> list[str]:
         lines = [line.strip() for line in text.split("\n") if line.strip()]
         for idx, line in enumerate(lines):
-            if line[0].isalnum() and not Formatter._is_list_item(line):
+            if line[0].isalnum() and not self._is_list_item(line):
                 lines[idx] = f"> {line}"
             else:
                 lines[idx] = f"    {line}"
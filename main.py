@@ -1,59 +1,242 @@
-from pathlib import Path
+import argparse
+from typing import Optional
 
-from tabulate import tabulate
-
-from .constants import testing_mode
-from .ind_processor import IndProcessor
-from .logger import Logger
-from .utils import update_serial_numbers
+from constants import PathManager, sqlite_archive, testing_mode, tracker_export
+from logger import Logger
+from pipeline.batch import BatchRunner
+from pipeline.manifest import ProcessingManifest
+from pipeline.review import ReviewQueue, ReviewSession
+from pipeline.watcher import FolderWatcher, IngestDaemon
+from storage.archive import JsonlArchive
+from storage.archivecopy import ArchiveCopier
+from storage.commit import BatchCommitter
+from storage.extraction import ExtractionCache
+from storage.journal import AwardJournal
+from storage.partitions import ensure_current_partition, using_partition
+from storage.pdfstore import ContentStore
+from storage.sqlitearchive import SqliteArchive
+from storage.tracker import TrackerExporter, update_serial_numbers
+from storage.tsv import TsvWriter
 
 logger = Logger()
 
 
-def main():
+def _recover() -> None:
+    """
+    Finishes interrupted batch commits first, then the per-award journal, in
+    every fiscal-year partition: a run cut short at rollover leaves its entries
+    in the previous year's.
+    """
+    ensure_current_partition()
+    for fiscal_year in PathManager.partitions():
+        with using_partition(fiscal_year):
+            BatchCommitter.recover()
+            AwardJournal().recover()
+
+
+def _manifest(retry_failed: bool) -> Optional[ProcessingManifest]:
+    # Testing runs leave the source files in place, so they must not be remembered.
+    if testing_mode:
+        return None
+    return ProcessingManifest(retry_failed=retry_failed)
+
+
+def _committer(commit_batch: Optional[int]) -> Optional[BatchCommitter]:
+    if not commit_batch:
+        return None
+    return BatchCommitter(batch_size=commit_batch)
+
+
+def _tracker() -> Optional[TrackerExporter]:
+    if testing_mode or not tracker_export:
+        return None
+    return TrackerExporter()
+
+
+def _extraction_cache(use_cache: bool) -> Optional[ExtractionCache]:
+    return ExtractionCache() if use_cache else None
+
+
+def _refresh_exports() -> None:
+    """Brings the legacy JSON export and the SQLite copy up to date after a batch."""
+    JsonlArchive().compact_in_background()
+    if sqlite_archive:
+        with SqliteArchive() as store:
+            store.sync()
+
+
+def main(
+    workers: Optional[int] = None,
+    retry_failed: bool = False,
+    headless: bool = False,
+    commit_batch: Optional[int] = 25,
+    use_cache: bool = True,
+):
+    _recover()
     if not testing_mode:
         update_serial_numbers()
+    runner = BatchRunner(
+        PathManager.submissions_dir,
+        max_workers=workers,
+        interactive=not headless,
+        manifest=_manifest(retry_failed),
+        review_queue=ReviewQueue() if headless else None,
+        committer=_committer(commit_batch),
+        extraction_cache=_extraction_cache(use_cache),
+        tracker=_tracker(),
+        copier=ArchiveCopier(),
+    )
     try:
-        processed_list: list[str] = []
-        failed_list: list[dict[str, str]] = []
+        runner.run()
+        runner.summary()
+        _refresh_exports()
+    except Exception as e:
+        logger.error(e)
+    except KeyboardInterrupt:
+        print("\nGoodbye!\n")
+    finally:
+        runner.copier.close()
 
-        folder: Path = Path(
-            r"C:\Users\joseph.strong\OneDrive - US Department of Energy\Python\awards\_submissions"
-        )
 
-        for pdf_path in folder.iterdir():
-            if pdf_path.is_file() and pdf_path.suffix == ".pdf":
-                if "GRP" in pdf_path.name or "NA-90" in pdf_path.name:
-                    continue
-                try:
-                    processor = IndProcessor(pdf_path)
-                    processor.process_pdf_data()
-                    processed_list.append(pdf_path.name)
-
-                except Exception as e:
-                    logger.error(e)
-                    e = " ".join(str(e).split(" ")[:12]) + "..."
-                    failed_list.append({"file": pdf_path.name, "error": e})
-
-        logger.info(f"\n\nProcessed Files Count: {len(processed_list)}")
-        if processed_list:
-            processed_table = tabulate(
-                {"processed": processed_list}, tablefmt="simple_outline", headers="keys"
-            )
-            logger.info(f"\n{processed_table}")
-
-        logger.info(f"\n\nProcess Failure Count: {len(failed_list)}")
-        if failed_list:
-            failed_table = tabulate(
-                failed_list, tablefmt="simple_outline", headers="keys"
-            )
-            logger.info(f"\n{failed_table}")
-        logger.dash()
-    except Exception as e:
-        logger.error(f"\n{pdf_path.stem}\n{e}")
+def watch(
+    workers: Optional[int] = None,
+    settle_seconds: float = 2.0,
+    retry_failed: bool = False,
+    commit_batch: Optional[int] = 25,
+    use_cache: bool = True,
+):
+    _recover()
+    if not testing_mode:
+        update_serial_numbers()
+    runner = BatchRunner(
+        PathManager.submissions_dir,
+        max_workers=workers,
+        interactive=False,
+        manifest=_manifest(retry_failed),
+        review_queue=ReviewQueue(),
+        committer=_committer(commit_batch),
+        extraction_cache=_extraction_cache(use_cache),
+        tracker=_tracker(),
+        copier=ArchiveCopier(),
+    )
+    watcher = FolderWatcher(PathManager.submissions_dir, settle_seconds=settle_seconds)
+    try:
+        IngestDaemon(runner, watcher).run()
+    except KeyboardInterrupt:
+        print("\nGoodbye!\n")
+    finally:
+        runner.copier.close()
+
+
+def export_json():
+    path = JsonlArchive().compact()
+    logger.info(f"Exported the archive to '{path}'.")
+
+
+def dedupe_archive():
+    ContentStore().import_existing()
+
+
+def regenerate_tsv():
+    count = TsvWriter().regenerate()
+    logger.info(f"Regenerated the TSV output for {count} awards.")
+
+
+def review(use_cache: bool = True):
+    _recover()
+    try:
+        ReviewSession(
+            manifest=_manifest(retry_failed=False),
+            extraction_cache=_extraction_cache(use_cache),
+        ).run()
     except KeyboardInterrupt:
         print("\nGoodbye!\n")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Process award nomination PDFs.")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to the CPU count; 1 runs serially.",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and process new PDFs as they land in the submissions folder.",
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="Seconds a new PDF must stay unchanged before it is processed in watch mode.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Queue awards with missing fields for review instead of prompting.",
+    )
+    parser.add_argument(
+        "--review",
+        action="store_true",
+        help="Work through the awards queued for review by headless or watch runs.",
+    )
+    parser.add_argument(
+        "--commit-batch",
+        type=int,
+        default=25,
+        help="Write the archive, TSV and serial numbers once per this many awards; "
+        "0 writes them for each award.",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Reprocess files that failed on a previous run even if they are unchanged.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every PDF again instead of reusing cached extractions.",
+    )
+    parser.add_argument(
+        "--export-json",
+        action="store_true",
+        help="Regenerate the legacy pretty-printed JSON archive from the JSONL archive.",
+    )
+    parser.add_argument(
+        "--regenerate-tsv",
+        action="store_true",
+        help="Rewrite the TSV output from the archive, one block of lines per log ID.",
+    )
+    parser.add_argument(
+        "--dedupe-archive",
+        action="store_true",
+        help="Store the PDFs already in the file archive once per distinct content.",
+    )
+    args = parser.parse_args()
+    if args.export_json:
+        export_json()
+    elif args.dedupe_archive:
+        dedupe_archive()
+    elif args.regenerate_tsv:
+        regenerate_tsv()
+    elif args.review:
+        review(use_cache=not args.no_cache)
+    elif args.watch:
+        watch(
+            workers=args.workers,
+            settle_seconds=args.settle,
+            retry_failed=args.retry_failed,
+            commit_batch=args.commit_batch,
+            use_cache=not args.no_cache,
+        )
+    else:
+        main(
+            workers=args.workers,
+            retry_failed=args.retry_failed,
+            headless=args.headless,
+            commit_batch=args.commit_batch,
+            use_cache=not args.no_cache,
+        )
@@ -0,0 +1,169 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import fitz
+
+_REFERENCE = re.compile(r"(\d+) 0 R")
+
+
+def _references(value: str) -> list[int]:
+    return [int(xref) for xref in _REFERENCE.findall(value)]
+
+
+def _array(doc: fitz.Document, xref: int, key: str) -> list[int]:
+    """The references in an array entry, which may itself be an indirect object."""
+    kind, value = doc.xref_get_key(xref, key)
+    if kind == "xref":
+        value = doc.xref_object(_references(value)[0], compressed=True)
+        kind = "array" if value.startswith("[") else kind
+    return _references(value) if kind == "array" else []
+
+
+@dataclass
+class AcroField:
+    name: str
+    xref: int
+    field_type: Optional[str] = None
+    widget_xrefs: tuple[int, ...] = ()
+
+
+class UnsupportedFormError(ValueError):
+    """Raised when a form has to be read through the widget API instead."""
+
+
+def iter_fields(doc: fitz.Document) -> Iterator[AcroField]:
+    """
+    Yields every terminal AcroForm field with its fully qualified name.
+    Reads the field tree straight from the catalog, so no page or widget is loaded.
+    """
+    if not doc.is_pdf:
+        return
+    stack: list[tuple[str, Optional[str], int]] = [
+        ("", None, xref)
+        for xref in reversed(_array(doc, doc.pdf_catalog(), "AcroForm/Fields"))
+    ]
+    visited: set[int] = set()
+    while stack:
+        parent_name, parent_type, xref = stack.pop()
+        if xref in visited:
+            continue
+        visited.add(xref)
+
+        kind, name = doc.xref_get_key(xref, "T")
+        if kind == "string":
+            name = f"{parent_name}.{name}" if parent_name else name
+        else:
+            name = parent_name
+
+        kind, field_type = doc.xref_get_key(xref, "FT")
+        field_type = field_type if kind == "name" else parent_type
+
+        kids = _array(doc, xref, "Kids")
+        child_fields = [kid for kid in kids if doc.xref_get_key(kid, "T")[0] == "string"]
+        if child_fields:
+            stack.extend((name, field_type, kid) for kid in reversed(child_fields))
+        elif name:
+            yield AcroField(name, xref, field_type, tuple(kids) or (xref,))
+
+
+def iter_field_xrefs(doc: fitz.Document) -> Iterator[tuple[str, int]]:
+    for field in iter_fields(doc):
+        yield field.name, field.xref
+
+
+def field_names(doc: fitz.Document) -> list[str]:
+    """The field tree's names, or the widgets' for a form the tree does not describe."""
+    names: list[str] = [field.name for field in iter_fields(doc)]
+    if names:
+        return names
+    return [field.field_name for page in doc for field in page.widgets()]
+
+
+def field_value(doc: fitz.Document, field: AcroField) -> str:
+    """Decodes /V the same way Widget.field_value does."""
+    kind, value = doc.xref_get_key(field.xref, "V")
+    if kind == "string":
+        return value
+    if kind == "name":
+        return value[1:]
+    if kind == "null":
+        return "Off" if field.field_type == "/Btn" else ""
+    raise UnsupportedFormError(
+        f"Unsupported value type '{kind}' for field '{field.name}'."
+    )
+
+
+def widget_pages(doc: fitz.Document) -> dict[int, int]:
+    """Widget annotation xref -> page number, read without building Widget objects."""
+    pages: dict[int, int] = {}
+    for page in doc:
+        for xref, annot_type, _ in page.annot_xrefs():
+            if annot_type == fitz.PDF_ANNOT_WIDGET:
+                pages[xref] = page.number
+    return pages
+
+
+def read_fields(
+    doc: fitz.Document, with_pages: bool = False
+) -> list[tuple[str, str, Optional[int]]]:
+    """
+    Returns (field name, value, page number) for every field in one pass over the
+    field tree. Page numbers are only looked up when `with_pages` is set.
+    Raises UnsupportedFormError when the widget API has to be used instead.
+    """
+    fields: list[AcroField] = list(iter_fields(doc))
+    if not fields:
+        raise UnsupportedFormError("No AcroForm field tree found.")
+    pages: dict[int, int] = widget_pages(doc) if with_pages else {}
+    results: list[tuple[str, str, Optional[int]]] = []
+    for field in fields:
+        page: Optional[int] = None
+        if with_pages:
+            page = next(
+                (pages[xref] for xref in field.widget_xrefs if xref in pages), None
+            )
+            if page is None:
+                raise UnsupportedFormError(f"No page found for field '{field.name}'.")
+        results.append((field.name, field_value(doc, field), page))
+    return results
+
+
+def read_widgets(doc: fitz.Document) -> list[tuple[str, str, Optional[int]]]:
+    return [
+        (field.field_name, field.field_value, page.number)
+        for page in doc
+        for field in page.widgets()
+    ]
+
+
+def read_form(
+    doc: fitz.Document, with_pages: bool = False
+) -> list[tuple[str, str, Optional[int]]]:
+    """read_fields(), falling back to the widget API for forms it cannot decode."""
+    try:
+        return read_fields(doc, with_pages)
+    except UnsupportedFormError:
+        return read_widgets(doc)
+
+
+def clear_fields(doc: fitz.Document) -> int:
+    """
+    Blanks every field by editing its dictionary directly: text values are removed
+    and buttons are switched off. Viewers rebuild the appearances on open.
+    Returns the number of fields cleared.
+    """
+    count: int = 0
+    for field in iter_fields(doc):
+        if field.field_type == "/Btn":
+            doc.xref_set_key(field.xref, "V", "/Off")
+            for xref in field.widget_xrefs:
+                doc.xref_set_key(xref, "AS", "/Off")
+        else:
+            doc.xref_set_key(field.xref, "V", "null")
+            for xref in field.widget_xrefs:
+                doc.xref_set_key(xref, "AP", "null")
+        count += 1
+    if count:
+        doc.xref_set_key(doc.pdf_catalog(), "AcroForm/NeedAppearances", "true")
+    return count
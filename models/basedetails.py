@@ -11,6 +11,7 @@ import fitz
 from constants import CONSULTANT_MAP
 from formatting.formatter import Formatter
 from logger import Logger
+from .acroform import read_form
 from .employee import Employee
 from .evaluator import Evaluator
 from .empextractor import EmployeeExtractor
@@ -83,13 +84,13 @@ class Base:
                 )
             self.log_id = IDManager.get(self.category)
 
-            for page in doc:
-                for field in page.widgets():
-                    key = formatter.key(field.field_name)
-                    if self.category == "GRP" and key not in self.evaluator.all_options:
-                        key = f"{page.number}.{key}"
-                    val = formatter.clean(field.field_value)
-                    self.pdf_data[key] = val
+            with_pages: bool = self.category == "GRP"
+            for field_name, field_value, page_number in read_form(doc, with_pages):
+                key = formatter.key(field_name)
+                if with_pages and key not in self.evaluator.all_options:
+                    key = f"{page_number}.{key}"
+                val = formatter.clean(field_value)
+                self.pdf_data[key] = val
         warnings.resetwarnings()
 
         if not self.pdf_data:
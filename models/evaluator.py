@@ -78,9 +78,9 @@ class Evaluator:
 
     @property
     def combined_percentage(self) -> Optional[float]:
-        if self.monetary_percentage and self.time_off_percentage:
-            return self.monetary_percentage + self.time_off_percentage
-        return None
+        if self.monetary_percentage is None and self.time_off_percentage is None:
+            return None
+        return (self.monetary_percentage or 0) + (self.time_off_percentage or 0)
 
     def add_employee(self, employee: Employee) -> None:
         try:
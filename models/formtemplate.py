@@ -0,0 +1,170 @@
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+from formatting.formatter import Formatter
+
+formatter = Formatter()
+
+IND_FIELD_MAP_PATH: Path = (
+    Path(__file__).resolve().parent.parent / "data" / "ind_field_name_data.json"
+)
+
+
+@lru_cache(maxsize=None)
+def load_field_map(path: Path = IND_FIELD_MAP_PATH) -> dict[str, list[str]]:
+    """Attribute name -> candidate field keys, in order of preference."""
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def fingerprint(field_names: Iterable[str]) -> str:
+    return hashlib.sha1("\n".join(sorted(set(field_names))).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FormTemplate:
+    """
+    The extraction plan for one version of the nomination form.
+
+    `keys` maps every raw field name to its Formatter.key() result, and `plan`
+    maps every attribute to the one field key that supplies it on this version,
+    so a PDF of a known template needs no fallback chains.
+    """
+
+    field_names: tuple[str, ...]
+    field_map_path: Path = IND_FIELD_MAP_PATH
+
+    def __post_init__(self):
+        self.fingerprint: str = fingerprint(self.field_names)
+        self.keys: dict[str, str] = {
+            name: formatter.key(name) for name in self.field_names
+        }
+        available: set[str] = set(self.keys.values())
+        self.plan: dict[str, Optional[str]] = {
+            attribute: next((key for key in candidates if key in available), None)
+            for attribute, candidates in load_field_map(self.field_map_path).items()
+        }
+
+    def key(self, field_name: str) -> str:
+        key = self.keys.get(field_name)
+        return key if key is not None else formatter.key(field_name)
+
+    def value(
+        self, attribute: str, pdf_data: dict[str, Optional[str]]
+    ) -> Optional[str]:
+        key = self.plan.get(attribute)
+        return pdf_data.get(key) if key is not None else None
+
+    @classmethod
+    def for_fields(
+        cls, field_names: Iterable[str], field_map_path: Path = IND_FIELD_MAP_PATH
+    ) -> "FormTemplate":
+        """Returns the cached template for this field-name set, building it on first use."""
+        field_names = tuple(sorted(set(field_names)))
+        cache_key = (fingerprint(field_names), field_map_path)
+        template = _templates.get(cache_key)
+        if template is None:
+            template = cls(field_names, field_map_path)
+            _templates[cache_key] = template
+        return template
+
+
+_templates: dict[tuple[str, Path], FormTemplate] = {}
+
+
+GRP_FIELD_MAP_PATH: Path = (
+    Path(__file__).resolve().parent.parent / "data" / "grp_field_name_data.json"
+)
+GRP_ROW_FIELDS: tuple[str, ...] = (
+    "name",
+    "org",
+    "pay_plan",
+    "supervisor_name",
+    "monetary_amount",
+    "time_off_amount",
+)
+_EMPLOYEE_NAME_KEY = re.compile(r"^[1-9]\d*\.employee_name(_\d+)?$")
+
+
+@dataclass
+class GroupTemplate:
+    """
+    The extraction plan for one version of the group nomination form.
+
+    Keys are page-prefixed ("1.employee_name_2"). `plan` maps each header
+    attribute to its field key and `rows` lists, per employee slot, the six
+    field keys that make up that row on this version of the form.
+    """
+
+    keys: tuple[str, ...]
+    field_map_path: Path = GRP_FIELD_MAP_PATH
+
+    def __post_init__(self):
+        self.fingerprint: str = fingerprint(self.keys)
+        available: set[str] = set(self.keys)
+        self.plan: dict[str, Optional[str]] = {}
+        self.rows: list[tuple[Optional[str], ...]] = []
+        used_names: set[str] = set()
+        for attribute, candidates in load_field_map(self.field_map_path).items():
+            if candidates and isinstance(candidates[0], list):
+                row = next(
+                    (
+                        alternative
+                        for alternative in candidates
+                        if alternative[0] in available
+                        and alternative[0] not in used_names
+                    ),
+                    None,
+                )
+                if row is not None:
+                    used_names.add(row[0])
+                    self.rows.append(
+                        tuple(key if key in available else None for key in row)
+                    )
+            else:
+                self.plan[attribute] = next(
+                    (key for key in candidates if key in available), None
+                )
+        self.unmatched: tuple[str, ...] = tuple(
+            key
+            for key in self.keys
+            if _EMPLOYEE_NAME_KEY.match(key) and key not in used_names
+        )
+
+    def value(
+        self, attribute: str, pdf_data: dict[str, Optional[str]]
+    ) -> Optional[str]:
+        key = self.plan.get(attribute)
+        return pdf_data.get(key) if key is not None else None
+
+    def row_values(
+        self, pdf_data: dict[str, Optional[str]]
+    ) -> list[dict[str, Optional[str]]]:
+        """One dict of GRP_ROW_FIELDS per slot, in slot order."""
+        return [
+            {
+                field: pdf_data.get(key) if key is not None else None
+                for field, key in zip(GRP_ROW_FIELDS, row)
+            }
+            for row in self.rows
+        ]
+
+    @classmethod
+    def for_keys(
+        cls, keys: Iterable[str], field_map_path: Path = GRP_FIELD_MAP_PATH
+    ) -> "GroupTemplate":
+        keys = tuple(sorted(set(keys)))
+        cache_key = (fingerprint(keys), field_map_path)
+        template = _group_templates.get(cache_key)
+        if template is None:
+            template = cls(keys, field_map_path)
+            _group_templates[cache_key] = template
+        return template
+
+
+_group_templates: dict[tuple[str, Path], GroupTemplate] = {}
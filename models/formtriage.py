@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import fitz
+
+from .acroform import field_names
+from .formtemplate import FormTemplate
+
+
+@dataclass
+class FormTriage:
+    """
+    Routes a nomination form using only its page count and field names.
+    No widget is loaded and no field value is decoded.
+    """
+
+    IND = "IND"
+    GRP = "GRP"
+    EXTERNAL = "EXTERNAL"
+    REJECT = "REJECT"
+
+    doc: fitz.Document
+
+    def __post_init__(self):
+        self.page_count: int = self.doc.page_count
+        self.template: FormTemplate = FormTemplate.for_fields(field_names(self.doc))
+        self.field_names: frozenset[str] = frozenset(self.template.keys.values())
+        self.route: Optional[str] = None
+        self.reason: Optional[str] = None
+        self._classify()
+
+    def _classify(self) -> None:
+        if not self.field_names:
+            self.route, self.reason = self.REJECT, "No form fields found in the PDF."
+        elif "employee's_name" in self.field_names:
+            self.route = self.EXTERNAL
+        elif self.page_count == 2:
+            self.route = self.IND
+        elif self.page_count in [3, 4, 5]:
+            self.route = self.GRP
+        else:
+            self.route = self.REJECT
+            self.reason = (
+                f"Invalid page count. Expected: [2, 3, 4, 5]  |  Received: {self.page_count}"
+            )
+
+    def __str__(self):
+        return f"FormTriage(route={self.route}, page_count={self.page_count}, template={self.template.fingerprint[:8]})"
@@ -1,8 +1,21 @@
 from dataclasses import dataclass
-from datetime import datetime
-from pathlib import Path
 from typing import Optional
-from utils import IDManager
+
+from tabulate import tabulate
+
+from constants import monetary_hold
+from formatting.formatter import Formatter
+from logger import Logger
+from utils import find_organization
+
+from .evaluator import Evaluator
+from .formtemplate import GroupTemplate
+from .formtriage import FormTriage
+from .individualdetails import IndProcessor
+
+formatter = Formatter()
+logger = Logger()
+
 
 @dataclass
 class GrpEmployee:
@@ -13,32 +26,318 @@ class GrpEmployee:
     time_off_amount: Optional[str|int] = None
     supervisor_name: Optional[str] = None
 
+    @staticmethod
+    def _amount(text: Optional[str]) -> int:
+        if not isinstance(text, str) or not formatter.clean(text):
+            return 0
+        amount = formatter.extract_int(text)
+        if amount != int(amount) or amount < 0:
+            raise ValueError(f"Amounts awarded must be positive integers: '{text}'")
+        return int(amount)
+
+    def is_blank(self) -> bool:
+        return not any(
+            formatter.clean(value) if isinstance(value, str) else value
+            for value in self.as_dict().values()
+        )
+
+    def normalize(self, org_lookup: dict[str, Optional[str]]) -> None:
+        """Formats the row in place. `org_lookup` memoizes org matches across the form."""
+        self.name = formatter.name(self.name) or None
+        self.supervisor_name = formatter.name(self.supervisor_name) or None
+        self.pay_plan = formatter.pay_plan(self.pay_plan)
+        if self.pay_plan and "es" in self.pay_plan.lower():
+            raise ValueError(
+                f"'ES' pay plans not allowed: {self.name} ({self.pay_plan})"
+            )
+        if self.org:
+            if self.org not in org_lookup:
+                org_match, div_match = find_organization(self.org)
+                org_lookup[self.org] = div_match if div_match else org_match
+            self.org = org_lookup[self.org]
+        self.monetary_amount = self._amount(self.monetary_amount)
+        self.time_off_amount = self._amount(self.time_off_amount)
+
+    def as_dict(self) -> dict[str, str | int | None]:
+        return {
+            "name": self.name,
+            "org": self.org,
+            "pay_plan": self.pay_plan,
+            "supervisor_name": self.supervisor_name,
+            "monetary_amount": self.monetary_amount,
+            "time_off_amount": self.time_off_amount,
+        }
 
 
 @dataclass
-class GrpProcessor:
-    source_path: Optional[Path | str] = None
+class GrpProcessor(IndProcessor):
+    """
+    Group nominations. Extraction, caching, prompts and saving are shared with
+    IndProcessor; the header fields and employee rows come from GroupTemplate.
+    """
 
     def __post_init__(self):
-        self.log_id: Optional[str] = IDManager.get("GRP")
-        self.funding_org: Optional[str] = None
-        self.funding_string: Optional[str] = None
-        self.nominator_name: Optional[str] = None
-        self.nominator_org: Optional[str] = None
-        self.certifier_name: Optional[str] = None
-        self.certifier_org: Optional[str] = None
-        self.approver_name: Optional[str] = None
-        self.approver_org: Optional[str] = None
+        super().__post_init__()
+        self.group_name: Optional[str] = None
         self.administrator_name: Optional[str] = None
         self.reviewer_name: Optional[str] = None
-        self.mb_division: Optional[str] = None
-        self.justification: Optional[str] = None
-        self.value: Optional[str] = None
-        self.extent: Optional[str] = None
-        self.category: Optional[str] = None
-        self.type: Optional[str] = None
-        self.date_received = datetime.now().strftime("%Y-%m-%d")
-        self.consultant: Optional[str] = None
+        self.employees: list[GrpEmployee] = []
+        self.group_template: Optional[GroupTemplate] = None
+        self.evaluator: Evaluator = Evaluator()
+
+    @classmethod
+    def from_extracted(cls, processor: IndProcessor) -> "GrpProcessor":
+        """Takes over a processor whose triage routed it to GRP, keeping its buffer and data."""
+        group = cls(processor.source_path)
+        for attribute in [
+            "pdf_buffer",
+            "content_hash",
+            "extraction_cache",
+            "pdf_data",
+            "route",
+            "template",
+            "defer_prompts",
+            "date_received",
+        ]:
+            setattr(group, attribute, getattr(processor, attribute))
+        return group
 
     def populate(self) -> None:
-        pass
\ No newline at end of file
+        self.prepare()
+
+    def populate_attributes(self, pdf_data: dict[str, Optional[str]]) -> None:
+        template = GroupTemplate.for_keys(pdf_data)
+        self.group_template = template
+
+        def field(attribute: str) -> Optional[str]:
+            return template.value(attribute, pdf_data)
+
+        self.group_name = formatter.clean(field("group_name")) or None
+        self.nominator_name = formatter.name(field("nominator_name")) or None
+        self.nominator_org = field("nominator_org")
+        self.certifier_name = formatter.name(field("certifier_name")) or None
+        self.certifier_org = field("certifier_org")
+        self.approver_name = formatter.name(field("approver_name")) or None
+        self.approver_org = field("approver_org")
+        self.funding_org = field("funding_org")
+        self.funding_string = field("funding_string")
+        self.justification = formatter.justification(field("justification")) or None
+
+        def is_checked(attribute: str) -> bool:
+            value = str(field(attribute) or "").strip().lower()
+            return value not in ["", "off", "no"]
+
+        self.type = "OTS" if is_checked("ots") and not is_checked("sas") else "SAS"
+
+        employees = [GrpEmployee(**row) for row in template.row_values(pdf_data)]
+        self.employees = [employee for employee in employees if not employee.is_blank()]
+
+        # The value and extent checkboxes keep their names on every page.
+        self.set_value_and_extent(
+            {key.split(".", 1)[-1]: value for key, value in pdf_data.items()}
+        )
+        self.category = "GRP"
+        logger.info(
+            f"Populated group attributes and {len(self.employees)} employee rows."
+        )
+
+    def normalize(self) -> None:
+        if self.pdf_data:
+            self.populate_attributes(self.pdf_data)
+
+    def _get_missing_fields(self) -> list[str]:
+        required_fields: dict[str, Optional[str]] = {
+            "group_name": self.group_name,
+            "nominator_name": self.nominator_name,
+            "approver_name": self.approver_name,
+            "justification": self.justification,
+        }
+        missing_fields = [k for k, v in required_fields.items() if v is None]
+        if self.group_template is not None and self.group_template.unmatched:
+            missing_fields.append(
+                f"employee rows not on the field map: {list(self.group_template.unmatched)}"
+            )
+        return missing_fields
+
+    def _validate_pay_plan(self) -> None:
+        """Pay plans are checked per employee in _normalize_employees."""
+
+    def _normalize_employees(self) -> None:
+        if not self.employees:
+            raise ValueError("No employees found on the group nomination.")
+        org_lookup: dict[str, Optional[str]] = {}
+        seen: set[str] = set()
+        employees: list[GrpEmployee] = []
+        for employee in self.employees:
+            employee.normalize(org_lookup)
+            if employee.name is None:
+                raise ValueError(f"Employee row without a name: {employee.as_dict()}")
+            if employee.name in seen:
+                logger.warning(f"Duplicate nominee '{employee.name}' ignored.")
+                continue
+            seen.add(employee.name)
+            employees.append(employee)
+        self.employees = employees
+        logger.info(f"Validated {len(self.employees)} employees.")
+
+    def _parse_org_divs(self) -> None:
+        org_matches: list[str] = []
+        for attribute in ["nominator_org", "certifier_org", "approver_org"]:
+            org_match, div_match = find_organization(getattr(self, attribute))
+            setattr(self, attribute, div_match if div_match else org_match)
+            if org_match:
+                org_matches.append(org_match)
+
+        if self.funding_org:
+            org_match, _ = find_organization(self.funding_org)
+            self.funding_org = org_match
+        if not self.funding_org:
+            self._determine_funding_organization(org_matches)
+        self._set_consultant()
+        mb_orgs: list[str] = [org for org in org_matches if "mb" in str(org).lower()]
+        if mb_orgs:
+            self._set_mb_division(mb_orgs)
+        logger.info("Parsed organizational divisions.")
+
+    def _evaluate(self) -> None:
+        """Checks the group totals against the award matrix in one pass."""
+        self.evaluator = Evaluator(
+            value=str(self.value).lower() if self.value else None,
+            extent=str(self.extent).lower() if self.extent else None,
+        )
+        for employee in self.employees:
+            self.evaluator.add_employee(employee)
+        self.monetary_amount = self.evaluator.monetary_amount
+        self.time_off_amount = self.evaluator.time_off_amount
+
+        if self.monetary_amount == 0 and self.time_off_amount == 0:
+            raise ValueError("No monetary or time-off amounts found.")
+        if self.monetary_amount and monetary_hold is True:
+            raise ValueError(
+                "Unable to process monetary awards at this time.\n"
+                f"monetary amount: {self.monetary_amount}\n"
+                f"time-off amount: {self.time_off_amount}"
+            )
+        if self.evaluator.value_idx is None or self.evaluator.extent_idx is None:
+            logger.warning("Value or extent not selected. Award limits not checked.")
+            return
+        self.evaluator.evaluate()
+        logger.info(f"\n{self.evaluator.details_table()}")
+
+    def _validate_and_transform(self) -> None:
+        self._validate_fields()
+        self._normalize_employees()
+        self._parse_org_divs()
+        self._evaluate()
+
+    def validate(self) -> None:
+        self._validate_and_transform()
+
+    def attributes(self) -> dict[str, str | None]:
+        monetary_amount = (
+            f"${self.monetary_amount}" if self.monetary_amount is not None else None
+        )
+        time_off_amount = (
+            f"{self.time_off_amount} hours"
+            if self.time_off_amount is not None
+            else None
+        )
+        justification = (
+            f"{len(self.justification.split(' '))} words"
+            if self.justification
+            else None
+        )
+        return {
+            "Source": self.source_path.name if self.source_path else None,
+            "Log ID": self.log_id,
+            "Group Name": self.group_name,
+            "Employees": str(len(self.employees)),
+            "Funding Org": self.funding_org,
+            "Funding String": self.funding_string,
+            "Monetary Amount": monetary_amount,
+            "Time-Off Amount": time_off_amount,
+            "Nominator Name": self.nominator_name,
+            "Nominator Org": self.nominator_org,
+            "Value": self.value,
+            "Extent": self.extent,
+            "Justification": justification,
+            "Category": self.category,
+            "Type": self.type,
+            "Date Received": self.date_received,
+            "HRC": self.consultant,
+        }
+
+    def _table(self):
+        table = super()._table()
+        rows = [employee.as_dict() for employee in self.employees]
+        return f"{table}\n{tabulate(rows, tablefmt='simple_outline', headers='keys')}"
+
+    def json_record(self) -> dict:
+        record: dict = {
+            "source_path": self.source_path.name if self.source_path else None,
+            "log_id": self.log_id,
+            "group_name": self.group_name,
+            "funding_org": self.funding_org,
+            "funding_string": self.funding_string,
+            "mb_division": self.mb_division,
+            "monetary_amount": self.monetary_amount,
+            "time_off_amount": self.time_off_amount,
+            "nominator_name": self.nominator_name,
+            "nominator_org": self.nominator_org,
+            "approver_name": self.approver_name,
+            "approver_org": self.approver_org,
+            "certifier_name": self.certifier_name,
+            "certifier_org": self.certifier_org,
+            "value": self.value,
+            "extent": self.extent,
+            "justification": f"{len(self.justification.split(' '))} words",
+            "category": self.category,
+            "type": self.type,
+            "date_received": self.date_received,
+            "consultant": self.consultant,
+        }
+        employees = sorted(self.employees, key=lambda employee: str(employee.name))
+        record["employees"] = {
+            idx: employee.as_dict() for idx, employee in enumerate(employees, start=1)
+        }
+        return record
+
+    def tsv_items(self) -> list[list[int | str | None]]:
+        """One row of TSV cells per employee, all under the group's log ID."""
+        self.mb_division = self.mb_division if self.mb_division else ""
+        _date_processed = ""
+        rows: list[list[int | str | None]] = []
+        for employee in self.employees:
+            rows.append(
+                [
+                    self.log_id,
+                    self.date_received,
+                    _date_processed,
+                    self.category,
+                    self.type,
+                    employee.name,
+                    employee.monetary_amount,
+                    employee.time_off_amount,
+                    employee.pay_plan,
+                    employee.org,
+                    employee.supervisor_name,
+                    self.group_name,
+                    self.nominator_name,
+                    self.funding_org,
+                    self.mb_division,
+                    self.justification,
+                    self.value,
+                    self.extent,
+                ]
+            )
+        return rows
+
+    def archive_stem_items(self) -> list:
+        return [self.log_id, self.funding_org, self.group_name, self.date_received]
+
+
+def for_route(processor: IndProcessor) -> IndProcessor:
+    """Returns a GrpProcessor for group forms and the processor itself otherwise."""
+    if processor.route == FormTriage.GRP and not isinstance(processor, GrpProcessor):
+        return GrpProcessor.from_extracted(processor)
+    return processor
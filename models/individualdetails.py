@@ -1,5 +1,3 @@
-import json
-import shutil
 import warnings
 from collections import Counter
 from dataclasses import dataclass
@@ -13,20 +11,36 @@ from tabulate import tabulate
 
 from constants import (
     CONSULTANT_MAP,
-    EvalManager,
     PathManager,
     monetary_hold,
     testing_mode,
 )
-from .evaluator import AwardEvaluator
-from .formatterclass import Formatter
-from .logger import Logger
-from .utils import IDManager, ManualEntry, find_mgmt_division, find_organization
+from formatting.formatter import Formatter
+from logger import Logger
+from storage.archivecopy import ArchiveCopier
+from storage.extraction import ExtractionCache
+from storage.journal import AwardJournal, JournalEntry
+from storage.pdfbuffer import PdfBuffer
+from storage.tsv import format_row
+from utils import IDManager, ManualEntry, find_mgmt_division, find_organization
+from .evaluator import Evaluator
+from .acroform import read_form
+from .formtemplate import FormTemplate
+from .formtriage import FormTriage
 
 console = Console()
+formatter = Formatter()
 logger = Logger()
 
 
+def _numerical(text: Optional[str]) -> Optional[int | float]:
+    """An amount field as a number; None when the field is blank."""
+    if not isinstance(text, str) or not formatter.clean(text):
+        return None
+    amount = formatter.extract_int(text)
+    return int(amount) if amount == int(amount) else amount
+
+
 @dataclass
 class BaseProcessor:
     source_path: Optional[Path | str] = None
@@ -50,6 +64,12 @@ class BaseProcessor:
         self.type: Optional[str] = None
         self.date_received = datetime.now().strftime("%Y-%m-%d")
         self.consultant: Optional[str] = None
+        self.pdf_buffer: Optional[PdfBuffer] = None
+        self.content_hash: Optional[str] = None
+        self.extraction_cache: Optional[ExtractionCache] = None
+        self.pdf_data: dict[str, Optional[str]] = {}
+        self.route: Optional[str] = None
+        self.template: Optional[FormTemplate] = None
 
     def handle_source_path(self) -> None:
         """Validates and processes the source path."""
@@ -78,20 +98,44 @@ class BaseProcessor:
         if not self.source_path.is_file() or not self.source_path.exists():
             raise ValueError(f"Source path is not a file or does not exist.")
 
-    def extract_pdf_data(self) -> dict[str, Optional[str]]:
+    def open_document(self) -> fitz.Document:
+        if self.pdf_buffer is not None:
+            return self.pdf_buffer.open()
+        return fitz.open(self.source_path)
+
+    def triage(self, doc: fitz.Document) -> None:
+        """Routes the form from its page count and field names before any value is read."""
+        triage = FormTriage(doc)
+        self.route = triage.route
+        self.template = triage.template
+        if triage.route == FormTriage.REJECT:
+            raise ValueError(triage.reason)
+        logger.info(f"Triage: {triage}")
+
+    def extract_pdf_data(
+        self, doc: Optional[fitz.Document] = None
+    ) -> dict[str, Optional[str]]:
+        if doc is None:
+            with self.open_document() as doc:
+                return self.extract_pdf_data(doc)
 
         warnings.filterwarnings("ignore", module="pymupdf")
 
         pdf_data = {}
 
-        with fitz.open(self.source_path) as doc:
-            if doc.page_count > 2:
-                raise ValueError("IndProcessor is unable to process GRP awards.")
-            for page in doc:
-                for field in page.widgets():
-                    key = Formatter(field.field_name).key()
-                    val = Formatter(field.field_value).value()
-                    pdf_data[key] = val
+        # Group forms repeat field names across pages, so their keys carry the page number.
+        with_pages: bool = self.route == FormTriage.GRP
+        if doc.page_count > 2 and not with_pages:
+            raise ValueError("IndProcessor is unable to process GRP awards.")
+        for field_name, field_value, page_number in read_form(doc, with_pages):
+            if self.template is not None:
+                key = self.template.key(field_name)
+            else:
+                key = formatter.key(field_name)
+            if with_pages:
+                key = f"{page_number}.{key}"
+            val = formatter.clean(field_value)
+            pdf_data[key] = val
 
         if not pdf_data:
             raise ValueError("No data extracted from the PDF.")
@@ -123,6 +167,11 @@ class IndProcessor(BaseProcessor):
         self.category = None
         self.type = None
         self.consultant = None
+        self.defer_prompts: bool = False
+        self.archive_copier: Optional[ArchiveCopier] = None
+        self.journal: Optional[AwardJournal] = None
+        self.pending_prompt: Optional[str] = None
+        self.missing_fields: list[str] = []
 
     def attributes(self) -> dict[str, str | None]:
         monetary_amount = (
@@ -170,69 +219,38 @@ class IndProcessor(BaseProcessor):
         table = tabulate(rows, tablefmt="simple_outline")
         return table
 
-    def key_filter(self, field1: str, field2: str, pdf_data: dict):
-        return field1 if field1 in pdf_data else field2 if field2 in pdf_data else None
-
     def populate_attributes(self, pdf_data: dict[str, Optional[str]]):
-        """Populates attributes from PDF data."""
+        """Populates attributes from PDF data using the form template's field plan."""
         category = "IND"
-        self.log_id = IDManager.get(category)
-
-        self.employee_name = Formatter(pdf_data.get("employee_name")).name()
-        self.employee_org = pdf_data.get("organization")
+        template = self.template or FormTemplate.for_fields(pdf_data)
 
-        key = self.key_filter("pay_plan_gradestep_1", "pay_plan_gradestep", pdf_data)
-        self.employee_pay_plan = Formatter(pdf_data.get(key)).pay_plan()
+        def field(attribute: str) -> Optional[str]:
+            return template.value(attribute, pdf_data)
 
-        key = self.key_filter("undefined", "amount", pdf_data)
-        self.sas_monetary_amount = Formatter(pdf_data.get(key)).numerical()
+        self.employee_name = formatter.name(field("employee_name"))
+        self.employee_org = field("employee_org")
+        self.employee_pay_plan = formatter.pay_plan(field("employee_pay_plan"))
+        self.sas_monetary_amount = _numerical(field("sas_monetary_amount"))
+        self.sas_time_off_amount = _numerical(field("sas_time_off_amount"))
+        self.ots_monetary_amount = _numerical(field("ots_monetary_amount"))
 
-        key = self.key_filter("hours_2", "hours", pdf_data)
-        self.sas_time_off_amount = Formatter(pdf_data.get(key)).numerical()
-
-        key = self.key_filter("on_the_spot_award", "amount_2", pdf_data)
-        self.ots_monetary_amount = Formatter(pdf_data.get(key)).numerical()
-
-        key = self.key_filter("hours", "hours_2", pdf_data)
+        ots_time_off = field("ots_time_off_amount")
         if pdf_data.get("undefined_2") is not None:
-            key = "undefined_2"
-        self.ots_time_off_amount = Formatter(pdf_data.get(key)).numerical()
-
-        key = self.key_filter("please_print", "nominators_name", pdf_data)
-        self.nominator_name = Formatter(pdf_data.get(key)).name()
-
-        key = self.key_filter("org", "organization_2", pdf_data)
-        self.nominator_org = pdf_data.get(key)
+            ots_time_off = pdf_data.get("undefined_2")
+        self.ots_time_off_amount = _numerical(ots_time_off)
 
-        key = self.key_filter(
-            "please_print_2", "a_nominees_team_leadersupervisor_1", pdf_data
+        self.nominator_name = formatter.name(field("nominator_name"))
+        self.nominator_org = field("nominator_org")
+        self.employee_supervisor_name = formatter.name(
+            field("employee_supervisor_name")
         )
-        self.employee_supervisor_name = Formatter(pdf_data.get(key)).name()
-
-        key = self.key_filter("org_3", "organization_3", pdf_data)
-        self.employee_supervisor_org = pdf_data.get(key)
-
-        key = "special_act_award_funding_string_2"
-        self.certifier_name = Formatter(pdf_data.get(key)).name()
-
-        self.certifier_org = pdf_data.get("org_2")
-
-        key = self.key_filter(
-            "please_print_3", "approving_officialdesignee_1", pdf_data
-        )
-        self.approver_name = Formatter(pdf_data.get(key)).name()
-
-        key = self.key_filter("org_4", "organization_5", pdf_data)
-        self.approver_org = pdf_data.get(key)
-
-        self.funding_string = pdf_data.get("special_act_award_funding_string_1")
-
-        key = self.key_filter(
-            "extent_of_application",
-            "extent_of_application_limited_extended_or_general",
-            pdf_data,
-        )
-        self.justification = Formatter(pdf_data.get(key)).justification()
+        self.employee_supervisor_org = field("employee_supervisor_org")
+        self.certifier_name = formatter.name(field("certifier_name"))
+        self.certifier_org = field("certifier_org")
+        self.approver_name = formatter.name(field("approver_name"))
+        self.approver_org = field("approver_org")
+        self.funding_string = field("funding_string")
+        self.justification = formatter.justification(field("justification"))
 
         self.set_value_and_extent(pdf_data)
         self.handle_external_pdf(pdf_data)
@@ -246,16 +264,16 @@ class IndProcessor(BaseProcessor):
         if "employee's_name" not in pdf_data:
             return
 
-        self.employee_name = Formatter(pdf_data.get("employee's_name")).name()
-        self.employee_pay_plan = Formatter(
+        self.employee_name = formatter.name(pdf_data.get("employee's_name"))
+        self.employee_pay_plan = formatter.pay_plan(
             pdf_data.get("position_title_series_and_grade")
-        ).pay_plan()
-        self.sas_monetary_amount = Formatter(
+        )
+        self.sas_monetary_amount = _numerical(
             pdf_data.get("special_act_amount_first_page")
-        ).numerical()
-        self.ots_monetary_amount = Formatter(
+        )
+        self.ots_monetary_amount = _numerical(
             pdf_data.get("on_the_spot_amount_first_page")
-        ).numerical()
+        )
 
         time_off_field = pdf_data.get("hours_first_page")
         if (
@@ -274,7 +292,7 @@ class IndProcessor(BaseProcessor):
             else ots_justif_field
         )
 
-        self.justification = Formatter(justification_text).justification()
+        self.justification = formatter.justification(justification_text)
         self.funding_org = "DOE"
         self.nominator_name = "--"
         self.employee_supervisor_name = "--"
@@ -284,17 +302,18 @@ class IndProcessor(BaseProcessor):
 
     def set_value_and_extent(self, pdf_data: dict[str, Optional[str]]) -> None:
         """Sets value and extent attributes based on PDF data options."""
+        options = Evaluator()
         value_options: list[str] = [
             k
             for k, v in pdf_data.items()
-            if str(k).lower() in EvalManager.value_options and str(v).lower() == "on"
+            if str(k).lower() in options.value_options and str(v).lower() == "on"
         ]
         self.value = value_options[0] if len(value_options) == 1 else None
 
         extent_options: list[str] = [
             k.capitalize()
             for k, v in pdf_data.items()
-            if str(k).capitalize() in EvalManager.extent_options
+            if str(k).lower() in options.extent_options
             and str(v).lower() == "on"
         ]
         self.extent = extent_options[0] if len(extent_options) == 1 else None
@@ -344,9 +363,13 @@ class IndProcessor(BaseProcessor):
     def _validate_fields(self) -> list[str]:
         """Validates form fields and prompts user for missing information."""
         missing_fields: list[str] = self._get_missing_fields()
+        self.missing_fields = missing_fields
         if missing_fields:
             error_msg: str = f"Missing Fields:\n{missing_fields}".strip()
-            self._prompt_user_action(error_msg)
+            if self.defer_prompts:
+                self.pending_prompt = error_msg
+            else:
+                self._prompt_user_action(error_msg)
         self._validate_pay_plan()
         logger.info("Validated form fields and handled missing fields.")
 
@@ -491,14 +514,11 @@ class IndProcessor(BaseProcessor):
             )
         logger.info("Award amounts meet the required criteria for further processing.")
 
-        try:
-            evaluator = AwardEvaluator(
-                self.value, self.extent, self.monetary_amount, self.time_off_amount
-            )
-            eval_results = evaluator.evaluate()
-            logger.info(eval_results)
-        except SyntaxError as se:
-            logger.warning(se)
+        evaluator = Evaluator(str(self.value).lower(), str(self.extent).lower())
+        evaluator.monetary_amount = self.monetary_amount
+        evaluator.time_off_amount = self.time_off_amount
+        evaluator.evaluate()
+        logger.info(f"\n{evaluator.details_table()}")
 
     def _validate_and_transform(self) -> None:
         self._validate_fields()
@@ -506,15 +526,14 @@ class IndProcessor(BaseProcessor):
         self._classify_amounts()
         self._validate_amounts()
 
-    def _save_json(self) -> None:
-        """
-        Saves all award data to a JSON file.
-        """
+    def json_record(self) -> dict[str, str | int | None]:
+        """Returns the award as it is stored in the JSON archive."""
         attributes: dict[str, str | int | None] = {
             "source_path": self.source_path.name if self.source_path else None,
             "log_id": self.log_id,
             "funding_org": self.funding_org,
             "funding_string": self.funding_string,
+            "mb_division": self.mb_division,
             "monetary_amount": self.monetary_amount,
             "time_off_amount": self.time_off_amount,
             "employee_name": self.employee_name,
@@ -543,20 +562,10 @@ class IndProcessor(BaseProcessor):
             else:
                 v = str(v)
             attributes[k] = v
-        
-        with open(PathManager.json_archive_path, "r", encoding="utf-8") as file:
-            content: str = file.read().strip()
-            content = "[]" if not content else content
-            json_data: dict[str, dict[str, str | int | None]] = json.loads(content)
-        json_data[attributes["log_id"]] = attributes
-
-        with open(PathManager.json_archive_path, "w", encoding="utf-8") as file:
-            json.dump(json_data, file, indent=4, sort_keys=False)
-
-        logger.info(f"'{PathManager.json_archive_path.name}' updated with new data")
+        return attributes
 
-    def _save_tsv(self) -> None:
-        """Saves data in TSV format to a file."""
+    def tsv_items(self) -> list[list[int | str | None]]:
+        """The award's TSV cells, one list per output row."""
         self.mb_division = self.mb_division if self.mb_division else ""
         _date_processed = ""
         _grp_name = None
@@ -580,61 +589,129 @@ class IndProcessor(BaseProcessor):
             self.value,
             self.extent,
         ]
-        for idx, item in enumerate(tsv_items):
-            if item is None:
-                tsv_items[idx] = "-"
-            else:
-                tsv_items[idx] = str(item)
-
-        tsv_string = "\t".join(tsv_items)
-
-        with open(PathManager.tsv_output_path, "a", encoding="utf-8") as file:
-            file.write(tsv_string + "\n")
-
-        logger.info(f"'{PathManager.tsv_output_path.name}' updated with new data")
+        return [tsv_items]
+
+    def tsv_row(self) -> str:
+        """Returns the award as TSV output, without the final newline."""
+        return "\n".join(format_row(items) for items in self.tsv_items())
+
+    def archive_stem_items(self) -> list:
+        return [self.log_id, self.funding_org, self.employee_name, self.date_received]
+
+    def journal_entry(self) -> JournalEntry:
+        """The award's commit as a write-ahead journal entry."""
+        archived_name: Optional[str] = None
+        if not testing_mode and isinstance(self.source_path, Path):
+            file_stem: str = " _ ".join(str(i) for i in self.archive_stem_items())
+            archived_name = self.source_path.with_stem(file_stem).name
+        return JournalEntry(
+            log_id=self.log_id,
+            category=self.category,
+            record=self.json_record(),
+            tsv_rows=self.tsv_row(),
+            source_path=str(self.source_path) if archived_name else None,
+            archived_name=archived_name,
+            archive_dir=str(PathManager.file_archive_dir) if archived_name else None,
+        )
 
-    def _rename_and_copy_file(self) -> None:
-        """Renames and copies a file to an archive path."""
-        if testing_mode or not isinstance(self.source_path, Path):
+    def _save_and_log(self, allocated: bool = False) -> None:
+        """
+        Saves the award through the journal, so a crash part-way is finished or
+        undone on the next start instead of leaving the stores out of step.
+        A log ID `allocated` for this save is released if the entry cannot be
+        written; once it is, the journal owns the ID.
+        """
+        journal = self.journal if self.journal is not None else AwardJournal()
+        try:
+            entry: JournalEntry = self.journal_entry()
+            journal.begin(entry)
+        except Exception:
+            if allocated:
+                IDManager.release(self.log_id)
+                self.log_id = None
+            raise
+        journal.commit(entry, self.pdf_buffer, self.archive_copier)
+        self.pdf_buffer = None
+
+    def load(self) -> None:
+        """Reads the PDF into memory so the extract stage does no file I/O."""
+        if self.source_path:
+            self.pdf_buffer = PdfBuffer.read(self.source_path)
+            self.content_hash = self.pdf_buffer.sha256
+
+    def _load_cached(self) -> bool:
+        if self.extraction_cache is None:
+            return False
+        entry: Optional[dict] = self.extraction_cache.get(self.content_hash)
+        if entry is None:
+            return False
+        self.route = entry["route"]
+        self.template = FormTemplate.for_fields(entry["field_names"])
+        self.pdf_data = entry["pdf_data"]
+        logger.info(f"Loaded {len(self.pdf_data)} cached items for this PDF.")
+        return True
+
+    def _store_cached(self) -> None:
+        if self.extraction_cache is None or self.content_hash is None:
             return
-        stem_items: list = [
-            self.log_id,
-            self.funding_org,
-            self.employee_name,
-            self.date_received,
-        ]
-        file_stem: str = " _ ".join(str(i) for i in stem_items)
-        new_path: Path = self.source_path.with_stem(file_stem)
-        renamed_path: Path = Path(self.source_path.rename(new_path))
-        target_path: Path = PathManager.file_archive_dir / renamed_path.name
         try:
-            shutil.copy2(renamed_path, target_path)
-        except PermissionError:
-            raise PermissionError(
-                "Permission denied. The file is still open in another application. Please close the file and try again."
+            self.extraction_cache.put(
+                self.content_hash, self.route, self.template.field_names, self.pdf_data
             )
-        except Exception as e:
-            logger.error(f"Error renaming and copying file: {e}")
-        renamed_path.unlink()
-        logger.info(f"File renamed and copied to '{PathManager.file_archive_dir.name}'")
+        except OSError as e:
+            logger.warning(f"Unable to cache the extraction. {e}")
 
-    def _save_and_log(self) -> None:
-        """Save data in different formats and log the category."""
-        self._save_json()
-        self._save_tsv()
-        self._rename_and_copy_file()
-        IDManager.update(self.category)
+    def extract(self) -> None:
+        if not self.source_path:
+            return
+        if self.pdf_buffer is None:
+            self.load()
+        if not self._load_cached():
+            with self.open_document() as doc:
+                self.triage(doc)
+                self.pdf_data = self.extract_pdf_data(doc)
+            self._store_cached()
+
+    def normalize(self) -> None:
+        if self.route == FormTriage.GRP:
+            return
+        if self.pdf_data:
+            self.populate_attributes(self.pdf_data)
 
-    def process_pdf_data(self) -> None:
-        if self.source_path:
-            pdf_data: dict[str, Optional[str]] = self.extract_pdf_data()
-            self.populate_attributes(pdf_data)
+    def validate(self) -> None:
+        if self.route == FormTriage.GRP:
+            return
         self._validate_and_transform()
-        self._save_and_log()
 
+    def prepare(self) -> None:
+        """Extracts, normalizes and validates the award without writing any output."""
+        self.extract()
+        self.normalize()
+        self.validate()
+
+    def confirm(self) -> None:
+        """Asks about any missing fields that were deferred during preparation."""
+        if self.pending_prompt:
+            self._prompt_user_action(self.pending_prompt)
+            self.pending_prompt = None
+
+    def log_completion(self) -> None:
         logger.info("PDF processing and data transformation complete.")
         logger.final(self._table())
 
+    def commit(self) -> None:
+        """Allocates the log ID and saves the prepared award."""
+        self.confirm()
+        allocated: bool = self.log_id is None
+        if allocated:
+            self.log_id = IDManager.get(self.category)
+        self._save_and_log(allocated)
+        self.log_completion()
+
+    def process_pdf_data(self) -> None:
+        self.prepare()
+        self.commit()
+
     def process_manual_entry(self) -> None:
         """Loads and processes manual entry data."""
         print("\n", " Manual Entry Mode ".center(100, "-"), "\n")
@@ -643,56 +720,48 @@ class IndProcessor(BaseProcessor):
             manual_entry_data: dict[str, str] = ManualEntry.load()
             self.category = "IND"
             self.log_id = IDManager.get(self.category)
-            self.employee_name = Formatter(
-                manual_entry_data.get("employee_name")
-            ).name()
-            self.employee_pay_plan = Formatter(
+            self.employee_name = formatter.name(manual_entry_data.get("employee_name"))
+            self.employee_pay_plan = formatter.pay_plan(
                 manual_entry_data.get("employee_pay_plan")
-            ).pay_plan()
-            self.employee_org = Formatter(manual_entry_data.get("employee_org")).value()
-            self.sas_monetary_amount = Formatter(
+            )
+            self.employee_org = formatter.clean(manual_entry_data.get("employee_org"))
+            self.sas_monetary_amount = _numerical(
                 manual_entry_data.get("sas_monetary_amount")
-            ).numerical()
-            self.sas_time_off_amount = Formatter(
+            )
+            self.sas_time_off_amount = _numerical(
                 manual_entry_data.get("sas_time_off_amount")
-            ).numerical()
-            self.ots_monetary_amount = Formatter(
+            )
+            self.ots_monetary_amount = _numerical(
                 manual_entry_data.get("ots_monetary_amount")
-            ).numerical()
-            self.ots_time_off_amount = Formatter(
+            )
+            self.ots_time_off_amount = _numerical(
                 manual_entry_data.get("ots_time_off_amount")
-            ).numerical()
-            self.nominator_name = Formatter(
+            )
+            self.nominator_name = formatter.name(
                 manual_entry_data.get("nominator_name")
-            ).name()
-            self.nominator_org = Formatter(
-                manual_entry_data.get("nominator_org")
-            ).value()
-            self.funding_string = Formatter(
+            )
+            self.nominator_org = formatter.clean(manual_entry_data.get("nominator_org"))
+            self.funding_string = formatter.clean(
                 manual_entry_data.get("funding_string")
-            ).value()
-            self.certifier_name = Formatter(
+            )
+            self.certifier_name = formatter.name(
                 manual_entry_data.get("certifier_name")
-            ).name()
-            self.certifier_org = Formatter(
-                manual_entry_data.get("certifier_org")
-            ).value()
-            self.employee_supervisor_name = Formatter(
+            )
+            self.certifier_org = formatter.clean(manual_entry_data.get("certifier_org"))
+            self.employee_supervisor_name = formatter.name(
                 manual_entry_data.get("employee_supervisor_name")
-            ).name()
-            self.employee_supervisor_org = Formatter(
+            )
+            self.employee_supervisor_org = formatter.name(
                 manual_entry_data.get("employee_supervisor_org")
-            ).name()
-            self.approver_name = Formatter(
-                manual_entry_data.get("approver_name")
-            ).name()
-            self.approver_org = Formatter(manual_entry_data.get("approver_org")).value()
-            self.value = Formatter(manual_entry_data.get("value")).value()
-            self.extent = Formatter(manual_entry_data.get("extent")).value()
-            self.justification = Formatter(
+            )
+            self.approver_name = formatter.name(manual_entry_data.get("approver_name"))
+            self.approver_org = formatter.clean(manual_entry_data.get("approver_org"))
+            self.value = formatter.clean(manual_entry_data.get("value"))
+            self.extent = formatter.clean(manual_entry_data.get("extent"))
+            self.justification = formatter.justification(
                 manual_entry_data.get("justification")
-            ).justification()
-            date_received = Formatter(manual_entry_data.get("date_received"))
+            )
+            date_received = formatter.clean(manual_entry_data.get("date_received"))
             if date_received:
                 self.date_received = date_received
 
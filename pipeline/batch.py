@@ -0,0 +1,348 @@
+import os
+import warnings
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Iterator, Optional
+
+from tabulate import tabulate
+
+from logger import Logger
+from models.formtemplate import load_field_map
+from models.groupdetails import for_route
+from models.individualdetails import IndProcessor
+from storage.archivecopy import ArchiveCopier
+from storage.commit import BatchCommitter
+from storage.extraction import ExtractionCache
+from storage.journal import AwardJournal
+from storage.partitions import ensure_current_partition
+from storage.pdfstore import file_sha256
+from storage.tracker import TrackerExporter
+from utils import org_index
+
+from .manifest import Fingerprint, ProcessingManifest
+from .review import ReviewQueue
+from .stages import Pipeline, Stage
+
+logger = Logger()
+
+
+def _warm_worker() -> None:
+    """Loads the org tables and field maps once per worker process instead of once per PDF."""
+    warnings.filterwarnings("ignore", module="pymupdf")
+    org_index()
+    load_field_map()
+
+
+# Stage functions run in worker threads or processes, so none of them may write
+# to the output stores. They are module-level so they can be pickled.
+
+
+def _read(pdf_path: Path, cache: Optional[ExtractionCache] = None) -> IndProcessor:
+    processor = IndProcessor(pdf_path)
+    processor.defer_prompts = True
+    processor.extraction_cache = cache
+    processor.load()
+    return processor
+
+
+def _extract(processor: IndProcessor) -> IndProcessor:
+    processor.extract()
+    return for_route(processor)
+
+
+def _transform(processor: IndProcessor) -> IndProcessor:
+    processor.normalize()
+    processor.validate()
+    return processor
+
+
+def _extract_and_transform(processor: IndProcessor) -> IndProcessor:
+    """Both CPU steps in one worker call, so the processor and its buffer cross once each way."""
+    return _transform(_extract(processor))
+
+
+def _prepare(
+    pdf_path: Path, cache: Optional[ExtractionCache] = None
+) -> tuple[Path, Optional[IndProcessor], Optional[str]]:
+    try:
+        return pdf_path, _extract_and_transform(_read(pdf_path, cache)), None
+    except Exception as e:
+        return pdf_path, None, str(e)
+
+
+@dataclass
+class BatchRunner:
+    folder: Path
+    max_workers: Optional[int] = None
+    interactive: bool = True
+    manifest: Optional[ProcessingManifest] = None
+    review_queue: Optional[ReviewQueue] = None
+    committer: Optional[BatchCommitter] = None
+    io_workers: int = 4
+    queue_size: int = 8
+    extraction_cache: Optional[ExtractionCache] = None
+    tracker: Optional[TrackerExporter] = None
+    copier: Optional[ArchiveCopier] = None
+    journal: Optional[AwardJournal] = None
+
+    def __post_init__(self):
+        self.folder = Path(self.folder)
+        if self.journal is None:
+            # One journal for the run, so the archive index and TSV are loaded once.
+            self.journal = (
+                self.committer.journal if self.committer is not None else AwardJournal()
+            )
+        self.max_workers = self.max_workers or os.cpu_count() or 1
+        self.processed_list: list[str] = []
+        self.failed_list: list[dict[str, str]] = []
+        self.queued_list: list[str] = []
+        self.unchanged_count: int = 0
+        self._fingerprints: dict[Path, Fingerprint] = {}
+
+    @staticmethod
+    def is_candidate(pdf_path: Path) -> bool:
+        return pdf_path.is_file() and pdf_path.suffix == ".pdf"
+
+    def pdf_paths(self) -> list[Path]:
+        return [path for path in self.folder.iterdir() if self.is_candidate(path)]
+
+    def _record(self, pdf_path: Path, status: str, **details: Optional[str]) -> None:
+        fingerprint = self._fingerprints.pop(pdf_path, None)
+        if self.manifest is None or fingerprint is None:
+            return
+        if fingerprint.sha256 is None:
+            # Only files that failed before their bytes were read get here.
+            try:
+                fingerprint.sha256 = file_sha256(pdf_path)
+            except OSError:
+                return
+        self.manifest.record(fingerprint, status, **details)
+
+    def _journaled(self) -> set[Path]:
+        """The files of commits the journal still holds open, under either name."""
+        paths: set[Path] = set()
+        for entry in self.journal.entries():
+            if entry.source_path is not None:
+                paths.update((Path(entry.source_path), entry.renamed_path))
+        return paths
+
+    def _pending(self, paths: list[Path]) -> list[Path]:
+        """
+        Drops files of open journal entries and anything the manifest
+        recognizes from its stat. NA-90 and group forms go through triage
+        like any other.
+        New files are not hashed here; their hash comes from the read stage's buffer.
+        """
+        pending: list[Path] = []
+        journaled: set[Path] = self._journaled()
+        for pdf_path in paths:
+            if pdf_path in journaled:
+                continue
+            if self.manifest is not None:
+                fingerprint = self.manifest.fingerprint(pdf_path, hash_new=False)
+                if self.manifest.is_done(fingerprint):
+                    self.unchanged_count += 1
+                    continue
+                self._fingerprints[pdf_path] = fingerprint
+            pending.append(pdf_path)
+        return pending
+
+    def _prepared(
+        self, paths: list[Path]
+    ) -> Iterator[tuple[Path, Optional[IndProcessor], Optional[str]]]:
+        """Yields prepared awards in folder order, regardless of which worker finished first."""
+        if self.max_workers == 1 or len(paths) < 2:
+            for pdf_path in paths:
+                yield _prepare(pdf_path, self.extraction_cache)
+            return
+
+        workers: int = min(self.max_workers, len(paths))
+        pipeline = Pipeline(
+            [
+                Stage(
+                    "read",
+                    partial(_read, cache=self.extraction_cache),
+                    workers=min(self.io_workers, len(paths)),
+                ),
+                Stage(
+                    "prepare",
+                    _extract_and_transform,
+                    workers=workers,
+                    processes=True,
+                    initializer=_warm_worker,
+                ),
+            ],
+            queue_size=self.queue_size,
+        )
+        yield from pipeline.run(paths)
+
+    def _seen_content(self, pdf_path: Path, processor: IndProcessor) -> bool:
+        """Checks a new file's content against the manifest, using the hash of its buffer."""
+        fingerprint = self._fingerprints.get(pdf_path)
+        if fingerprint is None or fingerprint.sha256 is not None:
+            return False
+        fingerprint.sha256 = processor.content_hash
+        if not self.manifest.is_done(fingerprint):
+            return False
+        self._fingerprints.pop(pdf_path)
+        self.unchanged_count += 1
+        return True
+
+    def _fail(self, pdf_path: Path, error: str, record: bool = True) -> None:
+        """
+        Reports a failed file. Only content failures are recorded in the manifest;
+        with record=False (a failed commit) the file is retried on the next run.
+        """
+        logger.error(error)
+        if record:
+            self._record(pdf_path, ProcessingManifest.FAILED, error=str(error))
+        else:
+            self._fingerprints.pop(pdf_path, None)
+        error = " ".join(str(error).split(" ")[:12]) + "..."
+        self.failed_list.append({"file": pdf_path.name, "error": error})
+
+    def _commit(
+        self, pdf_path: Path, processor: Optional[IndProcessor], error: Optional[str]
+    ) -> None:
+        """
+        The only place a batch touches log IDs, the JSON/TSV outputs and the file archive.
+        """
+        if error is not None:
+            self._fail(pdf_path, error)
+            return
+        if self._seen_content(pdf_path, processor):
+            return
+        if processor.pending_prompt and self.review_queue is not None:
+            self.review_queue.add(processor)
+            self.queued_list.append(pdf_path.name)
+            self._record(pdf_path, ProcessingManifest.QUEUED)
+            return
+        if processor.pending_prompt and not self.interactive:
+            error = f"Unable to proceed with processing. {processor.pending_prompt}"
+            self._fail(pdf_path, error)
+            return
+        processor.archive_copier = self.copier
+        processor.journal = self.journal
+        try:
+            if self.committer is None:
+                processor.commit()
+            else:
+                self.committer.add(processor)
+        except Exception as e:
+            if self.committer is None and self._saved(processor):
+                # Past the commit point; the journal finishes the rest on the next start.
+                self._committed(pdf_path, processor)
+                error = f"Saved as {processor.log_id}; completes on the next run. {e}"
+                logger.error(error)
+                self.failed_list.append({"file": pdf_path.name, "error": error})
+            else:
+                self._fail(pdf_path, str(e), record=False)
+            return
+        if self.committer is None:
+            self._committed(pdf_path, processor)
+        elif self.committer.full:
+            self._flush()
+
+    def _saved(self, processor: IndProcessor) -> bool:
+        """Whether the award's record reached the archive, the journal's commit point."""
+        return processor.log_id is not None and processor.log_id in self.journal.archive
+
+    def _committed(self, pdf_path: Path, processor: IndProcessor) -> None:
+        self.processed_list.append(pdf_path.name)
+        self._record(pdf_path, ProcessingManifest.PROCESSED, log_id=processor.log_id)
+        if self.tracker is not None:
+            self.tracker.add(processor.log_id, processor.tsv_items())
+
+    def _wait_for_copies(self) -> None:
+        """Waits for the batch's archive copies; failed ones stay journaled for a retry."""
+        if self.copier is None:
+            return
+        for entry, error in self.copier.wait():
+            error = f"Saved as {entry.log_id}; file not archived. {error}"
+            self.failed_list.append({"file": entry.archived_name, "error": error})
+
+    def _export(self) -> None:
+        """Adds the batch to the tracker; on failure the rows are kept for the next run."""
+        if self.tracker is None or not self.tracker.pending:
+            return
+        try:
+            self.tracker.flush()
+        except Exception as e:
+            logger.error(f"Unable to update the tracker workbook. {e}")
+
+    def _flush(self) -> None:
+        if self.committer is None or not self.committer.pending:
+            return
+        pending: list[IndProcessor] = list(self.committer.pending)
+        try:
+            results = self.committer.flush()
+        except Exception as e:
+            for processor in pending:
+                self._fail(
+                    Path(processor.source_path), f"Batch commit failed. {e}", record=False
+                )
+            return
+        for processor, error in results:
+            pdf_path = Path(processor.source_path)
+            self._committed(pdf_path, processor)
+            if error is not None:
+                error = f"Saved as {processor.log_id}; file not archived. {error}"
+                self.failed_list.append({"file": pdf_path.name, "error": error})
+
+    def process(self, paths: list[Path]) -> None:
+        if ensure_current_partition() and self.committer is not None:
+            # Serial numbers and the archive handle belong to the previous year.
+            self.committer.discard()
+        paths = self._pending(paths)
+        logger.info(f"Processing {len(paths)} files with {self.max_workers} workers.")
+        try:
+            for pdf_path, processor, error in self._prepared(paths):
+                self._commit(pdf_path, processor, error)
+            self._flush()
+            self._export()
+        finally:
+            self._wait_for_copies()
+            if self.committer is not None:
+                self.committer.release()
+            if self.manifest is not None:
+                self.manifest.save()
+
+    def run(self) -> None:
+        self.process(self.pdf_paths())
+
+    def reset(self) -> None:
+        self.processed_list.clear()
+        self.failed_list.clear()
+        self.queued_list.clear()
+        self.unchanged_count = 0
+
+    def summary(self) -> None:
+        if self.manifest is not None:
+            logger.info(f"\n\nUnchanged Files Skipped: {self.unchanged_count}")
+        logger.info(f"\n\nProcessed Files Count: {len(self.processed_list)}")
+        if self.processed_list:
+            processed_table = tabulate(
+                {"processed": self.processed_list},
+                tablefmt="simple_outline",
+                headers="keys",
+            )
+            logger.info(f"\n{processed_table}")
+
+        if self.review_queue is not None:
+            logger.info(f"\n\nQueued For Review Count: {len(self.queued_list)}")
+            if self.queued_list:
+                queued_table = tabulate(
+                    {"queued": self.queued_list},
+                    tablefmt="simple_outline",
+                    headers="keys",
+                )
+                logger.info(f"\n{queued_table}")
+
+        logger.info(f"\n\nProcess Failure Count: {len(self.failed_list)}")
+        if self.failed_list:
+            failed_table = tabulate(
+                self.failed_list, tablefmt="simple_outline", headers="keys"
+            )
+            logger.info(f"\n{failed_table}")
+        logger.dash()
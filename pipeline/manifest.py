@@ -0,0 +1,126 @@
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from constants import PathManager
+from storage.pdfstore import file_sha256
+
+
+@dataclass
+class Fingerprint:
+    name: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str]
+
+
+class ProcessingManifest:
+    """
+    Remembers the outcome of every submission by content hash.
+
+    A file whose name, size and mtime match the last run is recognized from a stat
+    call alone; anything else is hashed once so renamed or re-saved copies of an
+    already handled PDF are still recognized. Callers that read the file anyway
+    can skip that hash and fill it in from the bytes they read.
+    """
+
+    PROCESSED: str = "processed"
+    FAILED: str = "failed"
+    SKIPPED: str = "skipped"
+    QUEUED: str = "queued"
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        retry_failed: bool = False,
+        save_every: int = 25,
+    ):
+        self.path: Path = Path(path) if path else PathManager.manifest_path
+        self.retry_failed: bool = retry_failed
+        self.save_every: int = save_every
+        self.files: dict[str, dict[str, int | str]] = {}
+        self.outcomes: dict[str, dict[str, Optional[str]]] = {}
+        self._unsaved: int = 0
+        self.load()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as file:
+            content: str = file.read().strip()
+        if not content:
+            return
+        data: dict = json.loads(content)
+        self.files = data.get("files", {})
+        self.outcomes = data.get("outcomes", {})
+
+    def save(self) -> None:
+        temp_path: Path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"files": self.files, "outcomes": self.outcomes}, file, indent=4
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self._unsaved = 0
+
+    def fingerprint(self, path: Path, hash_new: bool = True) -> Fingerprint:
+        """With hash_new=False, a file not recognized from its stat gets no hash yet."""
+        stat = path.stat()
+        known = self.files.get(path.name)
+        sha256: Optional[str] = None
+        if (
+            known is not None
+            and known["size"] == stat.st_size
+            and known["mtime_ns"] == stat.st_mtime_ns
+        ):
+            sha256 = str(known["sha256"])
+        elif hash_new:
+            sha256 = file_sha256(path)
+        return Fingerprint(path.name, stat.st_size, stat.st_mtime_ns, sha256)
+
+    def outcome(self, fingerprint: Fingerprint) -> Optional[dict[str, Optional[str]]]:
+        return self.outcomes.get(fingerprint.sha256)
+
+    def is_done(self, fingerprint: Fingerprint) -> bool:
+        """True when this content was already processed, queued, or failed unchanged."""
+        outcome = self.outcome(fingerprint) if fingerprint.sha256 else None
+        if outcome is None:
+            return False
+        if outcome["status"] == self.SKIPPED:
+            # NA-90 files were skipped before they had a pipeline; they run now.
+            return False
+        if outcome["status"] == self.FAILED and self.retry_failed:
+            return False
+        return True
+
+    def record(
+        self,
+        fingerprint: Fingerprint,
+        status: str,
+        log_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        if status == self.PROCESSED:
+            # Processed files are renamed and archived, so their stat entry is useless.
+            self.files.pop(fingerprint.name, None)
+        else:
+            self.files[fingerprint.name] = {
+                "size": fingerprint.size,
+                "mtime_ns": fingerprint.mtime_ns,
+                "sha256": fingerprint.sha256,
+            }
+        self.outcomes[fingerprint.sha256] = {
+            "status": status,
+            "file": fingerprint.name,
+            "log_id": log_id,
+            "error": error,
+            "recorded": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
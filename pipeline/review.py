@@ -0,0 +1,177 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from tabulate import tabulate
+
+from constants import PathManager
+from logger import Logger
+from models.groupdetails import for_route
+from models.individualdetails import IndProcessor
+from storage.extraction import ExtractionCache
+
+from .manifest import ProcessingManifest
+
+logger = Logger()
+
+
+class ReviewQueue:
+    """
+    Awards that need a human decision, persisted so a batch never waits on input().
+    Each entry keeps the extracted pdf_data, so reviewing does not re-open the PDF.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path: Path = Path(path) if path else PathManager.review_queue_path
+        self.entries: dict[str, dict] = {}
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as file:
+            content: str = file.read().strip()
+        self.entries = json.loads(content) if content else {}
+
+    def save(self) -> None:
+        temp_path: Path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file, indent=4, sort_keys=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+    def add(self, processor: IndProcessor) -> None:
+        source_path: Path = Path(processor.source_path)
+        stat = source_path.stat()
+        self.entries[source_path.name] = {
+            "source_path": str(source_path.absolute()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "missing_fields": processor.missing_fields,
+            "reason": processor.pending_prompt,
+            "route": processor.route,
+            "queued": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "pdf_data": processor.pdf_data,
+        }
+        self.save()
+        logger.warning(f"Queued '{source_path.name}' for review.")
+
+    def remove(self, name: str) -> None:
+        self.entries.pop(name, None)
+        self.save()
+
+
+class ReviewSession:
+    """Works through the review queue interactively, one award at a time."""
+
+    options: dict[int, str] = {
+        1: "Continue processing.",
+        9: "Reject this award.",
+        0: "Leave it in the queue.",
+    }
+
+    def __init__(
+        self,
+        queue: Optional[ReviewQueue] = None,
+        manifest: Optional[ProcessingManifest] = None,
+        extraction_cache: Optional[ExtractionCache] = None,
+    ):
+        self.queue: ReviewQueue = queue if queue is not None else ReviewQueue()
+        self.manifest: Optional[ProcessingManifest] = manifest
+        self.extraction_cache: Optional[ExtractionCache] = extraction_cache
+
+    def _select(self) -> int:
+        while True:
+            logger.warning(
+                "Make a selection:\n"
+                + "\n".join(f"{k}: {v}" for k, v in self.options.items())
+            )
+            try:
+                selection: int = int(input("> ").strip() or 0)
+                if selection not in self.options:
+                    raise ValueError("Selection must be 1, 9 or 0.")
+                return selection
+            except Exception as e:
+                logger.error(f"Invalid selection. {e}")
+
+    def _record(self, source_path: Path, status: str, **details: Optional[str]) -> None:
+        if self.manifest is not None and source_path.exists():
+            fingerprint = self.manifest.fingerprint(source_path)
+            self.manifest.record(fingerprint, status, **details)
+
+    def review(self, name: str) -> None:
+        entry: dict = self.queue.entries[name]
+        source_path = Path(entry["source_path"])
+        if not source_path.exists():
+            logger.warning(f"'{name}' is no longer in the submissions folder. Dropped.")
+            self.queue.remove(name)
+            return
+
+        processor = IndProcessor(source_path)
+        processor.defer_prompts = True
+        processor.extraction_cache = self.extraction_cache
+        stat = source_path.stat()
+        try:
+            if (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+                processor.pdf_data = entry["pdf_data"]
+                processor.route = entry.get("route")
+            else:
+                # The PDF was corrected after it was queued.
+                processor.extract()
+            processor = for_route(processor)
+            processor.normalize()
+            processor.validate()
+        except Exception as e:
+            logger.error(e)
+            self._record(source_path, ProcessingManifest.FAILED, error=str(e))
+            self.queue.remove(name)
+            return
+
+        logger.info(f"\n{processor._table()}")
+        if processor.missing_fields:
+            logger.warning(f"Missing Fields:\n{processor.missing_fields}")
+        selection: int = self._select()
+        if selection == 0:
+            return
+        if selection == 9:
+            reason = f"Rejected in review. {entry['reason']}"
+            self._record(source_path, ProcessingManifest.FAILED, error=reason)
+            self.queue.remove(name)
+            return
+
+        processor.pending_prompt = None
+        fingerprint = self.manifest.fingerprint(source_path) if self.manifest else None
+        processor.commit()
+        if fingerprint is not None:
+            status = ProcessingManifest.PROCESSED
+            self.manifest.record(fingerprint, status, log_id=processor.log_id)
+        self.queue.remove(name)
+
+    def run(self) -> None:
+        if not self.queue.entries:
+            logger.info("The review queue is empty.")
+            return
+        rows = [
+            {
+                "file": name,
+                "missing": ", ".join(entry["missing_fields"]),
+                "queued": entry["queued"],
+            }
+            for name, entry in self.queue.entries.items()
+        ]
+        logger.info(f"\n{tabulate(rows, tablefmt='simple_outline', headers='keys')}")
+        try:
+            for name in list(self.queue.entries):
+                try:
+                    self.review(name)
+                except Exception as e:
+                    logger.error(f"{name}\n{e}")
+        finally:
+            if self.manifest is not None:
+                self.manifest.save()
@@ -0,0 +1,150 @@
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    One step of a Pipeline.
+    `workers` threads pull from the stage's input queue; with `processes=True`
+    each thread hands its item to a process pool of the same size instead of
+    running `func` itself.
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    processes: bool = False
+    initializer: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class _Job:
+    seq: int
+    key: Any
+    value: Any = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Pipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues.
+
+    Results come back in input order, and at most `queue_size` items wait between
+    any two stages, so memory is bounded by queue depth rather than batch size.
+    """
+
+    stages: list[Stage]
+    queue_size: int = 8
+    _stop: threading.Event = field(default_factory=threading.Event, init=False)
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(
+        self, items: Iterable[Any], target: queue.Queue, slots: threading.Semaphore
+    ) -> None:
+        for seq, item in enumerate(items):
+            while not slots.acquire(timeout=0.1):
+                if self._stop.is_set():
+                    return
+            if not self._put(target, _Job(seq, item, item)):
+                return
+        self._put(target, _DONE)
+
+    def _work(
+        self,
+        stage: Stage,
+        executor: Optional[Executor],
+        source: queue.Queue,
+        target: queue.Queue,
+        remaining: list[int],
+        lock: threading.Lock,
+    ) -> None:
+        while not self._stop.is_set():
+            job = source.get()
+            if job is _DONE:
+                # Let sibling workers see the marker; the last one passes it downstream.
+                source.put(_DONE)
+                with lock:
+                    remaining[0] -= 1
+                    if remaining[0] == 0:
+                        self._put(target, _DONE)
+                return
+            if job.error is None:
+                try:
+                    if executor is not None:
+                        job.value = executor.submit(stage.func, job.value).result()
+                    else:
+                        job.value = stage.func(job.value)
+                except Exception as e:
+                    job.value, job.error = None, str(e)
+            if not self._put(target, job):
+                return
+
+    def run(self, items: Iterable[Any]) -> Iterator[tuple[Any, Any, Optional[str]]]:
+        """Yields (item, result, error) for every input item, in input order."""
+        self._stop.clear()
+        queues: list[queue.Queue] = [
+            queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)
+        ]
+        # Caps items in flight, including results held back for in-order delivery.
+        slots = threading.Semaphore(self.queue_size * len(queues))
+        executors: list[Executor] = []
+        threads: list[threading.Thread] = [
+            threading.Thread(
+                target=self._feed, args=(items, queues[0], slots), daemon=True
+            )
+        ]
+        for idx, stage in enumerate(self.stages):
+            executor: Optional[Executor] = None
+            if stage.processes:
+                executor = ProcessPoolExecutor(
+                    max_workers=stage.workers, initializer=stage.initializer
+                )
+                executors.append(executor)
+            elif stage.initializer is not None:
+                stage.initializer()
+            remaining, lock = [stage.workers], threading.Lock()
+            args = (stage, executor, queues[idx], queues[idx + 1], remaining, lock)
+            for _ in range(stage.workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=args,
+                        name=f"{stage.name}-worker",
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+
+        try:
+            pending: dict[int, _Job] = {}
+            next_seq: int = 0
+            while True:
+                job = queues[-1].get()
+                if job is _DONE:
+                    break
+                pending[job.seq] = job
+                while next_seq in pending:
+                    done = pending.pop(next_seq)
+                    yield done.key, done.value, done.error
+                    slots.release()
+                    next_seq += 1
+        finally:
+            self._stop.set()
+            for executor in executors:
+                executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,163 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from logger import Logger
+from utils import org_index
+
+from .batch import BatchRunner
+
+logger = Logger()
+
+
+class _Inotify:
+    """Minimal ctypes binding for the Linux inotify API."""
+
+    IN_MODIFY: int = 0x00000002
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_TO: int = 0x00000080
+    IN_CREATE: int = 0x00000100
+    _event_header = struct.Struct("iIII")
+
+    def __init__(self, folder: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+
+    def read(self, timeout: float) -> list[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer: bytes = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names: list[str] = []
+        offset: int = 0
+        while offset < len(buffer):
+            _, _, _, length = self._event_header.unpack_from(buffer, offset)
+            offset += self._event_header.size
+            name = buffer[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+@dataclass
+class FolderWatcher:
+    """
+    Reports PDFs in a folder once they stop changing.
+    Uses inotify on Linux and falls back to polling everywhere else, including network shares.
+    """
+
+    folder: Path
+    settle_seconds: float = 2.0
+    poll_interval: float = 1.0
+    use_inotify: bool = True
+
+    def __post_init__(self):
+        self.folder = Path(self.folder)
+        self._pending: dict[Path, tuple[tuple[int, int], float]] = {}
+        self._seen: dict[Path, tuple[int, int]] = {}
+        self._inotify: Optional[_Inotify] = None
+        if self.use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(self.folder)
+                logger.info(f"Watching '{self.folder}' with inotify.")
+            except OSError as e:
+                logger.warning(f"inotify unavailable, polling instead. {e}")
+        if self._inotify is None:
+            logger.info(f"Polling '{self.folder}' every {self.poll_interval}s.")
+        for path in self.folder.iterdir():
+            self._touch(path)
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _touch(self, path: Path) -> None:
+        if path.suffix.lower() != ".pdf":
+            return
+        signature = self._signature(path)
+        if signature is None or self._seen.get(path) == signature:
+            return
+        pending = self._pending.get(path)
+        if pending is None or pending[0] != signature:
+            self._pending[path] = (signature, time.monotonic())
+
+    def _scan(self) -> None:
+        if self._inotify is not None:
+            for name in self._inotify.read(self.poll_interval):
+                self._touch(self.folder / name)
+        else:
+            time.sleep(self.poll_interval)
+            for path in self.folder.iterdir():
+                self._touch(path)
+
+    def ready(self) -> list[Path]:
+        """Blocks for one poll interval and returns the files that have settled since."""
+        self._scan()
+        now = time.monotonic()
+        settled: list[Path] = []
+        for path, (signature, since) in list(self._pending.items()):
+            current = self._signature(path)
+            if current is None:
+                self._pending.pop(path)
+            elif current != signature:
+                self._pending[path] = (current, now)
+            elif now - since >= self.settle_seconds:
+                self._pending.pop(path)
+                self._seen[path] = current
+                settled.append(path)
+        return sorted(settled)
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+@dataclass
+class IngestDaemon:
+    """Processes each new submission as soon as it lands, keeping lookup tables in memory."""
+
+    runner: BatchRunner
+    watcher: FolderWatcher
+
+    def run(self) -> None:
+        org_index()
+        logger.info(f"Ingestion daemon started for '{self.watcher.folder}'.")
+        try:
+            while True:
+                paths = [
+                    path
+                    for path in self.watcher.ready()
+                    if self.runner.is_candidate(path)
+                ]
+                if not paths:
+                    continue
+                self.runner.process(paths)
+                self.runner.summary()
+                self.runner.reset()
+        finally:
+            self.watcher.close()
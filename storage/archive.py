@@ -0,0 +1,332 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from constants import PathManager
+from logger import Logger
+
+from .filelock import FileLock
+
+logger = Logger()
+
+Record = dict[str, str | int | None]
+
+
+def _fsync(file) -> None:
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def iter_legacy_json(path: Path, chunk_size: int = 1 << 16) -> Iterator[tuple[str, Record]]:
+    """
+    Yields (log_id, record) from a pretty-printed {log_id: record} JSON file
+    without loading it whole: the text is read in chunks and each record is
+    decoded as soon as it is complete.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as file:
+        buffer: str = ""
+        position: int = 0
+        at_eof: bool = False
+
+        def fill() -> bool:
+            nonlocal buffer, position, at_eof
+            chunk: str = file.read(chunk_size)
+            buffer, position = buffer[position:] + chunk, 0
+            at_eof = not chunk
+            return not at_eof
+
+        def token() -> str:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position].isspace():
+                    position += 1
+                if position < len(buffer) or not fill():
+                    return buffer[position : position + 1]
+
+        def decode():
+            nonlocal position
+            token()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                if end < len(buffer) or at_eof or not fill():
+                    position = end
+                    return value
+                # The value ran to the end of the buffer and may continue past it.
+
+        first: str = token()
+        if first == "":
+            return
+        if first != "{":
+            raise ValueError(f"'{path}' is not a JSON object.")
+        position += 1
+        while True:
+            separator: str = token()
+            if separator == ",":
+                position += 1
+                continue
+            if separator == "}":
+                return
+            key = decode()
+            if token() != ":":
+                raise ValueError(f"Malformed archive entry after '{key}' in '{path}'.")
+            position += 1
+            yield str(key), decode()
+
+
+class JsonlArchive:
+    """
+    The award archive as one JSON record per line, appended and never rewritten.
+
+    A side index of "log_id<TAB>offset" lines, also append-only, gives O(1)
+    lookups. Records written after the last indexed one (e.g. after a crash)
+    are picked up from the tail of the archive when the index is loaded. A
+    log ID that appears twice resolves to its latest line.
+
+    The legacy pretty-printed _output_JSON.json is only produced by compact().
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        index_path: Optional[Path] = None,
+        legacy_path: Optional[Path] = None,
+    ):
+        self.path: Path = Path(path) if path else PathManager.jsonl_archive_path
+        self.index_path: Path = (
+            Path(index_path) if index_path else PathManager.jsonl_index_path
+        )
+        self.legacy_path: Path = (
+            Path(legacy_path) if legacy_path else PathManager.json_archive_path
+        )
+        self.lock: FileLock = FileLock(self.path.with_suffix(".lock"))
+        self._offsets: Optional[dict[str, int]] = None
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Seeds the JSONL archive from the legacy JSON file on first use."""
+        if self.path.exists() or not self.legacy_path.exists():
+            return
+        self.index_path.unlink(missing_ok=True)
+        count: int = 0
+        batch: list[Record] = []
+        for _, record in iter_legacy_json(self.legacy_path):
+            batch.append(record)
+            if len(batch) == 1000:
+                self.append_many(batch)
+                count, batch = count + len(batch), []
+        self.append_many(batch)
+        count += len(batch)
+        if count:
+            logger.info(f"Migrated {count} records to '{self.path.name}'.")
+
+    @property
+    def offsets(self) -> dict[str, int]:
+        if self._offsets is None:
+            self._offsets = self._load_index()
+        return self._offsets
+
+    def _load_index(self) -> dict[str, int]:
+        offsets: dict[str, int] = {}
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    log_id, _, offset = line.rstrip("\n").rpartition("\t")
+                    if log_id and offset.isdigit():
+                        offsets[log_id] = int(offset)
+
+        size: int = self.path.stat().st_size if self.path.exists() else 0
+        if any(offset >= size for offset in offsets.values()):
+            # The archive was truncated or replaced; the index cannot be trusted.
+            offsets = {}
+            self.index_path.unlink(missing_ok=True)
+
+        start: int = 0
+        if offsets:
+            with open(self.path, "rb") as file:
+                file.seek(max(offsets.values()))
+                file.readline()
+                start = file.tell()
+        if start < size:
+            missing = dict(self._scan(start))
+            self._write_index(missing)
+            offsets.update(missing)
+        return offsets
+
+    def _scan(self, start: int = 0) -> Iterator[tuple[str, int]]:
+        """Yields (log_id, offset) for every complete record from `start` on."""
+        with open(self.path, "rb") as file:
+            file.seek(start)
+            while True:
+                offset: int = file.tell()
+                line: bytes = file.readline()
+                if not line.endswith(b"\n"):
+                    return
+                try:
+                    log_id = json.loads(line).get("log_id")
+                except ValueError:
+                    continue
+                if log_id is not None:
+                    yield str(log_id), offset
+
+    def _write_index(self, offsets: dict[str, int]) -> None:
+        if not offsets:
+            return
+        with open(self.index_path, "a", encoding="utf-8") as file:
+            file.writelines(
+                f"{log_id}\t{offset}\n" for log_id, offset in offsets.items()
+            )
+            _fsync(file)
+
+    def __contains__(self, log_id: str) -> bool:
+        return log_id in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def get(self, log_id: str) -> Optional[Record]:
+        offset = self.offsets.get(log_id)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            return json.loads(file.readline())
+
+    @staticmethod
+    def _encode(records: Iterable[Record]) -> list[bytes]:
+        return [
+            (json.dumps(record, sort_keys=False) + "\n").encode("utf-8")
+            for record in records
+        ]
+
+    def _repair_tail(self) -> None:
+        """Drops a half-written last line left by a crash, so appends start clean."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+        with open(self.path, "rb+") as file:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) == b"\n":
+                return
+            end: int = file.tell()
+            position: int = end
+            while position > 0:
+                step: int = min(4096, position)
+                position -= step
+                file.seek(position)
+                newline: int = file.read(step).rfind(b"\n")
+                if newline != -1:
+                    position += newline + 1
+                    break
+            file.truncate(position)
+        logger.warning(f"Dropped {end - position} bytes of an incomplete archive record.")
+
+    def append(self, record: Record) -> None:
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Record]) -> None:
+        """Appends the records with one write and one fsync."""
+        lines: list[bytes] = self._encode(records)
+        if not lines:
+            return
+        with self.lock:
+            self._repair_tail()
+            offsets: dict[str, int] = {}
+            with open(self.path, "ab") as file:
+                offset: int = file.tell()
+                for line in lines:
+                    log_id = json.loads(line).get("log_id")
+                    if log_id is not None:
+                        offsets[str(log_id)] = offset
+                    offset += len(line)
+                file.write(b"".join(lines))
+                _fsync(file)
+            self._write_index(offsets)
+        if self._offsets is not None:
+            self._offsets.update(offsets)
+
+    def stage(self, records: Iterable[Record], segment_path: Path) -> int:
+        """
+        Writes the records to `segment_path` for apply_segment() and returns the
+        current archive size, which apply_segment() needs to be safely re-run.
+        """
+        with open(segment_path, "wb") as file:
+            file.write(b"".join(self._encode(records)))
+            _fsync(file)
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def apply_segment(self, segment_path: Path, base_size: int) -> None:
+        """Appends a staged segment at `base_size`. Running it twice is harmless."""
+        if not Path(segment_path).exists():
+            return
+        with self.lock, open(self.path, "ab") as file:
+            file.truncate(base_size)
+            with open(segment_path, "rb") as segment:
+                file.write(segment.read())
+            _fsync(file)
+        Path(segment_path).unlink()
+        if self._offsets is not None:
+            # Index just the appended records rather than reloading the index.
+            appended: dict[str, int] = dict(self._scan(base_size))
+            self._write_index(appended)
+            self._offsets.update(appended)
+
+    def records(self) -> Iterator[Record]:
+        """
+        Latest version of every record, in first-archived order. Streams the file
+        and reads superseded records' latest lines through the index, so only
+        log IDs and offsets are held in memory.
+        """
+        if not self.path.exists():
+            return
+        self._offsets = None
+        offsets: dict[str, int] = self.offsets
+        seen: set[str] = set()
+        with open(self.path, "rb") as file, open(self.path, "rb") as latest:
+            offset: int = 0
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                record: Record = json.loads(line)
+                log_id: str = str(record.get("log_id"))
+                latest_offset = offsets.get(log_id)
+                if latest_offset is not None and log_id not in seen:
+                    seen.add(log_id)
+                    if latest_offset != offset:
+                        latest.seek(latest_offset)
+                        record = json.loads(latest.readline())
+                    yield record
+                offset += len(line)
+
+    def load(self) -> dict[str, Record]:
+        return {str(record["log_id"]): record for record in self.records()}
+
+    def compact(self, target_path: Optional[Path] = None) -> Path:
+        """Writes the legacy pretty-printed JSON archive from the JSONL records."""
+        target_path = Path(target_path) if target_path else self.legacy_path
+        temp_path: Path = target_path.with_suffix(target_path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            # Written record by record; the output matches json.dump(indent=4).
+            file.write("{")
+            separator: str = "\n"
+            for record in self.records():
+                entry: str = json.dumps({str(record["log_id"]): record}, indent=4)
+                file.write(separator + entry[2:-2])
+                separator = ",\n"
+            file.write("\n}" if separator != "\n" else "}")
+            _fsync(file)
+        os.replace(temp_path, target_path)
+        logger.info(f"'{target_path.name}' regenerated from '{self.path.name}'.")
+        return target_path
+
+    def compact_in_background(self) -> threading.Thread:
+        """Runs compact() on a non-daemon thread, so the process waits for it at exit."""
+        thread = threading.Thread(target=self.compact, name="archive-compaction")
+        thread.start()
+        return thread
@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from logger import Logger
+
+from .journal import AwardJournal, JournalEntry
+from .pdfbuffer import PdfBuffer
+
+logger = Logger()
+
+
+class ArchiveCopier:
+    """
+    Copies archived PDFs to the network share on a small thread pool, so a batch
+    no longer waits on the share for every file.
+
+    At most `max_pending` copies are queued or running; submit() blocks beyond
+    that, which also bounds the PDF buffers held in memory. A PermissionError
+    (the file is open somewhere) is retried with exponential backoff. Each
+    award's journal entry stays open until its copy is verified, so a copy
+    that never finishes is retried by AwardJournal.recover() on the next start.
+    """
+
+    def __init__(
+        self,
+        journal: Optional[AwardJournal] = None,
+        max_workers: int = 4,
+        max_pending: int = 16,
+        attempts: int = 5,
+        backoff: float = 0.5,
+    ):
+        self.journal: AwardJournal = journal if journal is not None else AwardJournal()
+        self.attempts: int = attempts
+        self.backoff: float = backoff
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="archive-copy"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures: dict[Future, JournalEntry] = {}
+
+    def submit(self, entry: JournalEntry, pdf_buffer: Optional[PdfBuffer] = None) -> None:
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._copy, entry, pdf_buffer)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures[future] = entry
+
+    def _copy(self, entry: JournalEntry, pdf_buffer: Optional[PdfBuffer]) -> None:
+        for attempt in range(1, self.attempts + 1):
+            try:
+                self.journal.copy_file(entry, pdf_buffer)
+                self.journal.end(entry)
+                return
+            except PermissionError as e:
+                if attempt == self.attempts:
+                    raise
+                delay: float = self.backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    f"{entry.log_id}: archive copy attempt {attempt} failed; "
+                    f"retrying in {delay:.1f}s. {e}"
+                )
+                time.sleep(delay)
+
+    def wait(self) -> list[tuple[JournalEntry, str]]:
+        """Waits for every submitted copy and returns the ones that failed."""
+        failures: list[tuple[JournalEntry, str]] = []
+        for future, entry in list(self._futures.items()):
+            error = future.exception()
+            if error is not None:
+                logger.error(f"{entry.log_id}: file not archived. {error}")
+                failures.append((entry, str(error)))
+        self._futures = {}
+        return failures
+
+    def close(self) -> list[tuple[JournalEntry, str]]:
+        failures = self.wait()
+        self._executor.shutdown()
+        return failures
@@ -0,0 +1,226 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from constants import PathManager, testing_mode
+from logger import Logger
+from models.individualdetails import IndProcessor
+from utils import IDManager
+
+from .archive import JsonlArchive
+from .journal import AwardJournal, JournalEntry
+from .logids import parse_log_id
+from .tsv import TsvWriter
+
+logger = Logger()
+
+
+def _write_synced(path: Path, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+class BatchCommitter:
+    """
+    Collects prepared awards and writes the JSON archive, the TSV output and the
+    serial numbers for all of them at once.
+
+    The new archive records and TSV lines are staged as segments and the serial
+    numbers as an fsync'd temp file. A marker listing them is written next, and
+    only then are the segments appended and the temp file renamed over the original.
+    If the process dies after the marker is written, recover() finishes the
+    commit on the next start, so the three stores never disagree. Each award is
+    journaled before the marker too, and AwardJournal finishes its file moves.
+    """
+
+    marker_suffix: str = ".commit"
+
+    def __init__(self, batch_size: int = 25):
+        self.batch_size: int = batch_size
+        self.pending: list[IndProcessor] = []
+        self._archive: Optional[JsonlArchive] = None
+        self._records: dict[str, dict[str, str | int | None]] = {}
+        self._tsv: Optional[TsvWriter] = None
+        self._entries: dict[str, JournalEntry] = {}
+        self.journal: AwardJournal = AwardJournal()
+        self._serial_numbers: Optional[dict[str, int]] = None
+        self._reserved: dict[str, list[str]] = {}
+        self.recover()
+
+    @property
+    def marker_path(self) -> Path:
+        return PathManager.json_archive_path.with_suffix(self.marker_suffix)
+
+    @property
+    def full(self) -> bool:
+        return len(self.pending) >= self.batch_size
+
+    @classmethod
+    def _apply_marker(
+        cls, archive: Optional[JsonlArchive] = None, tsv: Optional[TsvWriter] = None
+    ) -> bool:
+        marker_path = PathManager.json_archive_path.with_suffix(cls.marker_suffix)
+        if not marker_path.exists():
+            return False
+        with open(marker_path, "r", encoding="utf-8") as file:
+            marker: dict = json.load(file)
+        segment: Optional[str] = marker.get("segment")
+        if segment is not None:
+            archive = archive if archive is not None else JsonlArchive()
+            archive.apply_segment(Path(segment), marker["base_size"])
+        tsv_segment: Optional[str] = marker.get("tsv_segment")
+        if tsv_segment is not None:
+            tsv = tsv if tsv is not None else TsvWriter()
+            tsv.apply_segment(Path(tsv_segment), marker["tsv_base_size"])
+        replacements: dict[str, str] = marker.get("replacements", {})
+        for temp_path, target_path in replacements.items():
+            if Path(temp_path).exists():
+                os.replace(temp_path, target_path)
+        marker_path.unlink()
+        return True
+
+    @classmethod
+    def recover(cls) -> None:
+        """Completes a commit that was interrupted after its temp files were written."""
+        if cls._apply_marker():
+            logger.warning("Completed an interrupted batch commit.")
+
+    def _load(self) -> None:
+        # The journal's archive and TSV writer stay loaded between batches.
+        self._archive = self.journal.archive
+        self._tsv = self.journal.tsv
+        if self._serial_numbers is None and not testing_mode:
+            self._serial_numbers = IDManager.load_SN_data()
+
+    def _allocate(self, category: str) -> str:
+        """
+        Hands out IDs from a block reserved under the registry lock, so concurrent
+        runs never collide and the lock is taken once per block, not once per award.
+        """
+        if testing_mode:
+            return IDManager.get(category)
+        floor = self._serial_numbers.get(category)
+        if floor is None:
+            raise ValueError(f"Data not found for category: {category}")
+        if not self._reserved.get(category):
+            self._reserved[category] = IDManager.registry().reserve(
+                category, count=self.batch_size, floor=floor
+            )
+        log_id: str = self._reserved[category].pop(0)
+        self._serial_numbers[category] = max(floor, parse_log_id(log_id)[2] + 1)
+        return log_id
+
+    def _unallocate(self, category: str, log_id: str) -> None:
+        if testing_mode:
+            return
+        self._reserved.setdefault(category, []).insert(0, log_id)
+        self._serial_numbers[category] = parse_log_id(log_id)[2]
+
+    def release(self) -> None:
+        """Returns every reserved but unused log ID to the registry."""
+        unused: list[str] = [
+            log_id for log_ids in self._reserved.values() for log_id in log_ids
+        ]
+        self._reserved = {}
+        if unused and not testing_mode:
+            IDManager.registry().release(unused)
+
+    def add(self, processor: IndProcessor) -> None:
+        self._load()
+        processor.confirm()
+        allocated: bool = processor.log_id is None
+        if allocated:
+            processor.log_id = self._allocate(processor.category)
+        try:
+            entry: JournalEntry = processor.journal_entry()
+        except Exception:
+            if allocated:
+                # Back to the front of the block, so the next award takes it.
+                self._unallocate(processor.category, processor.log_id)
+                processor.log_id = None
+            raise
+        self._entries[processor.log_id] = entry
+        self._records[processor.log_id] = entry.record
+        self._tsv.add(processor.log_id, entry.tsv_rows)
+        self.pending.append(processor)
+
+    def _stage(self) -> dict:
+        """Stages every store and returns the marker that applies them."""
+        replacements: dict[str, str] = {}
+        for entry in self._entries.values():
+            self.journal.begin(entry)
+
+        segment = self._archive.path.with_suffix(".jsonl.segment")
+        base_size: int = self._archive.stage(self._records.values(), segment)
+
+        tsv_segment = self._tsv.path.with_suffix(".txt.segment")
+        tsv_base_size: int = self._tsv.stage(tsv_segment)
+
+        if self._serial_numbers is not None:
+            serial_temp = PathManager.serial_path.with_suffix(".yaml.tmp")
+            content = yaml.safe_dump(self._serial_numbers, indent=4, sort_keys=False)
+            _write_synced(serial_temp, content)
+            replacements[str(serial_temp)] = str(PathManager.serial_path)
+        return {
+            "segment": str(segment),
+            "base_size": base_size,
+            "tsv_segment": str(tsv_segment),
+            "tsv_base_size": tsv_base_size,
+            "replacements": replacements,
+        }
+
+    def flush(self) -> list[tuple[IndProcessor, Optional[str]]]:
+        """
+        Commits every pending award. Nothing is written if staging fails.
+        Returns each committed award with the error from archiving its file, if any.
+        """
+        if not self.pending:
+            return []
+        committed: list[IndProcessor] = self.pending
+        try:
+            marker = self._stage()
+            _write_synced(self.marker_path, json.dumps(marker))
+        except Exception:
+            if not testing_mode:
+                IDManager.registry().release(list(self._records))
+            for entry in self._entries.values():
+                self.journal.end(entry)
+            self.discard()
+            raise
+        self._apply_marker(self._archive, self._tsv)
+        entries: dict[str, JournalEntry] = self._entries
+        self.discard()
+        logger.info(f"Committed {len(committed)} awards in one batch.")
+
+        results: list[tuple[IndProcessor, Optional[str]]] = []
+        for processor in committed:
+            try:
+                # The records are in; the journal finishes the file moves.
+                self.journal.commit(
+                    entries[processor.log_id],
+                    processor.pdf_buffer,
+                    processor.archive_copier,
+                )
+                processor.pdf_buffer = None
+                processor.log_completion()
+                results.append((processor, None))
+            except Exception as e:
+                logger.error(e)
+                results.append((processor, str(e)))
+        return results
+
+    def discard(self) -> None:
+        """Drops pending awards and the in-memory state that already counted them."""
+        self.pending = []
+        self._archive = None
+        self._records = {}
+        self._entries = {}
+        if self._tsv is not None:
+            self._tsv.clear()
+        self._tsv = None
+        self._serial_numbers = None
@@ -0,0 +1,53 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+from constants import PathManager
+
+# Bump whenever triage or the key/value normalization in extract_pdf_data changes,
+# so entries written by an older extractor are ignored instead of reused.
+EXTRACTOR_VERSION: str = "2"
+
+
+class ExtractionCache:
+    """
+    Raw extraction results on disk, keyed by PDF content hash and extractor version.
+
+    Each entry is its own small JSON file written with an atomic rename, so worker
+    processes can fill the cache concurrently without a lock.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, version: str = EXTRACTOR_VERSION):
+        self.directory: Path = Path(directory) if directory else PathManager.extraction_cache_dir
+        self.version: str = version
+
+    def path(self, content_hash: str) -> Path:
+        return self.directory / content_hash[:2] / f"{content_hash}.v{self.version}.json"
+
+    def get(self, content_hash: str) -> Optional[dict]:
+        """Returns {"route", "field_names", "pdf_data"} or None on a miss."""
+        try:
+            with open(self.path(content_hash), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def put(
+        self,
+        content_hash: str,
+        route: Optional[str],
+        field_names: tuple[str, ...],
+        pdf_data: dict[str, Optional[str]],
+    ) -> None:
+        path: Path = self.path(content_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry: dict = {
+            "route": route,
+            "field_names": list(field_names),
+            "pdf_data": pdf_data,
+        }
+        temp_path: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file, sort_keys=False)
+        os.replace(temp_path, path)
@@ -0,0 +1,79 @@
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    An exclusive lock on `path` shared by every process on the machine (and, on
+    SMB shares that honour byte-range locks, across machines).
+    Uses fcntl.flock on POSIX and msvcrt.locking on Windows.
+    """
+
+    def __init__(
+        self, path: Path, timeout: Optional[float] = 30.0, poll: float = 0.05
+    ):
+        self.path: Path = Path(path)
+        self.timeout: Optional[float] = timeout
+        self.poll: float = poll
+        self._fd: Optional[int] = None
+        self._depth: int = 0
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self) -> None:
+        if self._depth:
+            self._depth += 1
+            return
+        fd: int = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline: Optional[float] = (
+            time.monotonic() + self.timeout if self.timeout is not None else None
+        )
+        while not self._try_lock(fd):
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(fd)
+                raise TimeoutError(
+                    f"Timed out waiting for the lock on '{self.path.name}'."
+                )
+            time.sleep(self.poll)
+        self._fd = fd
+        self._depth = 1
+
+    def release(self) -> None:
+        if not self._depth:
+            return
+        self._depth -= 1
+        if self._depth:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
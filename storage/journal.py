@@ -0,0 +1,226 @@
+import json
+import os
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from constants import PathManager, testing_mode
+from logger import Logger
+from utils import IDManager
+
+from .archive import JsonlArchive, Record
+from .logids import parse_log_id
+from .pdfbuffer import PdfBuffer
+from .pdfstore import ContentStore, file_sha256
+from .tsv import TsvWriter
+
+if TYPE_CHECKING:
+    from .archivecopy import ArchiveCopier
+
+logger = Logger()
+
+
+@dataclass
+class JournalEntry:
+    """Everything one award's commit will do, written down before any of it happens."""
+
+    log_id: str
+    category: str
+    record: Record
+    tsv_rows: str
+    source_path: Optional[str] = None
+    archived_name: Optional[str] = None
+    archive_dir: Optional[str] = None
+
+    @property
+    def renamed_path(self) -> Optional[Path]:
+        if self.source_path is None or self.archived_name is None:
+            return None
+        return Path(self.source_path).with_name(self.archived_name)
+
+
+class AwardJournal:
+    """
+    A write-ahead journal for committing awards.
+
+    An entry listing the award's effects is written (and fsync'd) before any
+    of them happens. The effects are the archive record, the TSV lines, the
+    serial number and the file moves. Every step checks whether it has
+    already happened, so an entry can be replayed any number of times, and it
+    is deleted once all steps are done.
+
+    Appending the archive record is the commit point. On startup, recover()
+    replays every entry whose record reached the archive. Any other entry is
+    rolled back: the source file gets its name back and the log ID is
+    released.
+
+    The archive, the TSV writer and the serial numbers are loaded once and
+    reused for every award, until the fiscal-year partition changes.
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self._directory: Optional[Path] = Path(directory) if directory else None
+        self._archive: Optional[JsonlArchive] = None
+        self._tsv: Optional[TsvWriter] = None
+        self._serials: dict[str, int] = {}
+        self._serial_path: Optional[Path] = None
+        self._stores: dict[str, ContentStore] = {}
+
+    @property
+    def directory(self) -> Path:
+        """The current partition's journal, unless a folder was given."""
+        return self._directory if self._directory is not None else PathManager.journal_dir
+
+    @property
+    def archive(self) -> JsonlArchive:
+        if self._archive is None or self._archive.path != PathManager.jsonl_archive_path:
+            self._archive = JsonlArchive()
+        return self._archive
+
+    @property
+    def tsv(self) -> TsvWriter:
+        if self._tsv is None or self._tsv.path != PathManager.tsv_output_path:
+            self._tsv = TsvWriter()
+        return self._tsv
+
+    def path(self, log_id: str) -> Path:
+        return self.directory / f"{log_id}.json"
+
+    def begin(self, entry: JournalEntry) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path: Path = self.path(entry.log_id)
+        temp_path: Path = path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(asdict(entry), file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+
+    def end(self, entry: JournalEntry) -> None:
+        self.path(entry.log_id).unlink(missing_ok=True)
+
+    def entries(self) -> list[JournalEntry]:
+        if not self.directory.exists():
+            return []
+        entries: list[JournalEntry] = []
+        for path in sorted(self.directory.glob("*.json")):
+            with open(path, "r", encoding="utf-8") as file:
+                entries.append(JournalEntry(**json.load(file)))
+        return entries
+
+    def _save_record(self, entry: JournalEntry) -> None:
+        if entry.log_id not in self.archive:
+            self.archive.append(entry.record)
+            logger.info(f"'{self.archive.path.name}' updated with new data")
+
+    def _save_tsv(self, entry: JournalEntry) -> None:
+        if entry.log_id not in self.tsv:
+            self.tsv.add(entry.log_id, entry.tsv_rows)
+            self.tsv.flush()
+
+    def _save_serial(self, entry: JournalEntry) -> None:
+        """
+        Moves the category's next serial past this award's, once. The file is
+        only read again when the serial it last showed is behind this award.
+        """
+        parsed = parse_log_id(entry.log_id)
+        if testing_mode or parsed is None:
+            return
+        next_serial: int = parsed[2] + 1
+        if self._serial_path != PathManager.serial_path:
+            self._serials, self._serial_path = {}, PathManager.serial_path
+        if self._serials.get(entry.category, 0) >= next_serial:
+            return
+        self._serials = IDManager.load_SN_data()
+        if self._serials.get(entry.category, 0) < next_serial:
+            IDManager.update(entry.category, next_serial)
+            self._serials[entry.category] = next_serial
+
+    def _rename(self, entry: JournalEntry) -> None:
+        renamed_path = entry.renamed_path
+        if renamed_path is None:
+            return
+        source_path = Path(entry.source_path)
+        if source_path.exists() and not renamed_path.exists():
+            source_path.rename(renamed_path)
+
+    def store(self, archive_dir: str) -> ContentStore:
+        """One ContentStore per archive folder, so its index is read once."""
+        if archive_dir not in self._stores:
+            self._stores[archive_dir] = ContentStore(Path(archive_dir))
+        return self._stores[archive_dir]
+
+    def copy_file(
+        self, entry: JournalEntry, pdf_buffer: Optional[PdfBuffer] = None
+    ) -> None:
+        """
+        Puts the renamed PDF in the content-addressed file archive and removes the
+        local file once the stored copy's size and hash match. Bytes the archive
+        already holds are not copied again.
+        """
+        renamed_path = entry.renamed_path
+        if renamed_path is None or entry.archive_dir is None or not renamed_path.exists():
+            return
+        if pdf_buffer is not None:
+            size, digest = pdf_buffer.size, pdf_buffer.sha256
+        else:
+            size, digest = renamed_path.stat().st_size, file_sha256(renamed_path)
+
+        def write(path: Path) -> None:
+            if pdf_buffer is not None:
+                pdf_buffer.write_to(path, stat_source=renamed_path)
+            else:
+                shutil.copy2(renamed_path, path)
+
+        try:
+            self.store(entry.archive_dir).put(entry.archived_name, digest, size, write)
+        except PermissionError:
+            raise PermissionError(
+                "Permission denied. The file is still open in another application. Please close the file and try again."
+            )
+        renamed_path.unlink()
+
+    def commit(
+        self,
+        entry: JournalEntry,
+        pdf_buffer: Optional[PdfBuffer] = None,
+        copier: Optional["ArchiveCopier"] = None,
+    ) -> None:
+        """
+        Carries out every step of the entry that has not happened yet. With a
+        copier, the copy to the file archive runs in the background and the
+        entry is closed when it succeeds.
+        """
+        self._save_record(entry)
+        self._save_tsv(entry)
+        self._save_serial(entry)
+        self._rename(entry)
+        if copier is not None:
+            copier.submit(entry, pdf_buffer)
+            return
+        self.copy_file(entry, pdf_buffer)
+        self.end(entry)
+
+    def roll_back(self, entry: JournalEntry) -> None:
+        renamed_path = entry.renamed_path
+        if renamed_path is not None and renamed_path.exists():
+            source_path = Path(entry.source_path)
+            if not source_path.exists():
+                renamed_path.rename(source_path)
+        if not testing_mode and parse_log_id(entry.log_id) is not None:
+            IDManager.registry().release([entry.log_id])
+        self.end(entry)
+
+    def recover(self) -> None:
+        """Finishes or undoes the commits left behind by an interrupted run."""
+        for entry in self.entries():
+            try:
+                if entry.log_id in self.archive:
+                    self.commit(entry)
+                    logger.warning(f"Completed the interrupted commit of {entry.log_id}.")
+                else:
+                    self.roll_back(entry)
+                    logger.warning(f"Rolled back the interrupted commit of {entry.log_id}.")
+            except Exception as e:
+                logger.error(f"Unable to recover {entry.log_id}; it stays journaled. {e}")
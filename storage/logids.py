@@ -0,0 +1,127 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+from constants import PathManager
+
+from .archive import JsonlArchive
+from .filelock import FileLock
+
+_RELEASED: str = "-"
+
+
+def format_log_id(fiscal_year: int, category: str, serial: int) -> str:
+    return f"{str(fiscal_year)[-2:]}-{category}-{str(serial).zfill(3)}"
+
+
+def parse_log_id(log_id: str) -> Optional[tuple[str, str, int]]:
+    """'25-IND-042' -> ('25', 'IND', 42); None for anything else (e.g. test UUIDs)."""
+    parts = log_id.split("-")
+    if len(parts) != 3 or not parts[2].isdigit():
+        return None
+    return parts[0], parts[1], int(parts[2])
+
+
+class LogIdRegistry:
+    """
+    Every log ID handed out, as an append-only list, with the next free serial
+    per category kept in memory.
+
+    Each change happens under an exclusive file lock, after reading whatever
+    other processes appended since this one last looked, so two runs can never
+    issue the same ID. A line starting with "-" returns an unused ID.
+    The first run seeds the file from the archive's log-ID index.
+    """
+
+    def __init__(self, path: Optional[Path] = None, fiscal_year: Optional[int] = None):
+        self.path: Path = Path(path) if path else PathManager.log_id_registry_path
+        self.fiscal_year: int = fiscal_year or PathManager.fiscal_year
+        self.lock: FileLock = FileLock(self.path.with_suffix(".lock"))
+        self._prefix: str = str(self.fiscal_year)[-2:]
+        self._issued: dict[str, set[int]] = {}
+        self._next: dict[str, int] = {}
+        self._offset: int = 0
+        with self.lock:
+            if not self.path.exists():
+                self._seed()
+            self._refresh()
+
+    def _seed(self) -> None:
+        self._write(list(JsonlArchive().offsets))
+
+    def _refresh(self) -> None:
+        """Applies the lines appended since the last refresh."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as file:
+            file.seek(self._offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                self._offset += len(line)
+                self._apply(line.decode("utf-8").strip())
+
+    def _apply(self, entry: str) -> None:
+        released: bool = entry.startswith(_RELEASED)
+        parsed = parse_log_id(entry.lstrip(_RELEASED))
+        if parsed is None or parsed[0] != self._prefix:
+            return
+        _, category, serial = parsed
+        issued: set[int] = self._issued.setdefault(category, set())
+        if released:
+            issued.discard(serial)
+            self._next[category] = min(self._next.get(category, serial), serial)
+        else:
+            issued.add(serial)
+
+    def _write(self, entries: list[str]) -> None:
+        if not entries:
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.writelines(f"{entry}\n" for entry in entries)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def __contains__(self, log_id: str) -> bool:
+        parsed = parse_log_id(log_id)
+        if parsed is None or parsed[0] != self._prefix:
+            return False
+        return parsed[2] in self._issued.get(parsed[1], set())
+
+    def next_serial(self, category: str, floor: int = 1) -> int:
+        """
+        The lowest free serial at or above both `floor` and the cursor. The cursor
+        only moves back when an ID is released, so skipping is amortized O(1).
+        """
+        issued: set[int] = self._issued.get(category, set())
+        serial: int = max(floor, self._next.get(category, floor))
+        while serial in issued:
+            serial += 1
+        self._next[category] = serial
+        return serial
+
+    def reserve(self, category: str, count: int = 1, floor: int = 1) -> list[str]:
+        """Atomically issues the next `count` free log IDs for `category`."""
+        with self.lock:
+            self._refresh()
+            log_ids: list[str] = []
+            for _ in range(count):
+                serial: int = self.next_serial(category, floor)
+                log_ids.append(format_log_id(self.fiscal_year, category, serial))
+                self._issued.setdefault(category, set()).add(serial)
+                self._next[category] = serial + 1
+            self._write(log_ids)
+            self._offset = self.path.stat().st_size
+        return log_ids
+
+    def issue(self, category: str, floor: int = 1) -> str:
+        return self.reserve(category, 1, floor)[0]
+
+    def release(self, log_ids: list[str]) -> None:
+        """Returns reserved IDs that were never used, so the serials are not skipped."""
+        if not log_ids:
+            return
+        with self.lock:
+            self._refresh()
+            self._write([f"{_RELEASED}{log_id}" for log_id in log_ids])
+            self._refresh()
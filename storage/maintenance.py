@@ -0,0 +1,92 @@
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from logger import Logger
+
+from .archive import JsonlArchive, Record, _fsync
+from .logids import parse_log_id
+
+logger = Logger()
+
+# A rule returns the record (changed or not), or None to drop it.
+Rule = Callable[[Record], Optional[Record]]
+
+
+def drop_test_records(record: Record) -> Optional[Record]:
+    """Drops records saved in testing mode, whose log IDs are UUIDs."""
+    return record if parse_log_id(str(record.get("log_id"))) else None
+
+
+def strip_text(record: Record) -> Record:
+    """Trims whitespace around text fields and turns empty ones into None."""
+    return {
+        key: (value.strip() or None) if isinstance(value, str) else value
+        for key, value in record.items()
+    }
+
+
+@dataclass
+class MaintenanceReport:
+    read: int = 0
+    changed: int = 0
+    dropped: int = 0
+
+    @property
+    def written(self) -> int:
+        return self.read - self.dropped
+
+    def __str__(self) -> str:
+        return (
+            f"initial count: {self.read}\n"
+            f"items removed: {self.dropped}\n"
+            f"items changed: {self.changed}\n"
+            f"final count: {self.written}"
+        )
+
+
+def rewrite(
+    rules: Iterable[Rule],
+    archive: Optional[JsonlArchive] = None,
+    dry_run: bool = False,
+) -> MaintenanceReport:
+    """
+    Passes the latest version of every archived record through `rules` and
+    writes the survivors to a temp file that then replaces the archive.
+
+    One streaming pass: only the current record and the log-ID index are held
+    in memory. The archive lock keeps committers from appending mid-rewrite.
+    """
+    archive = archive if archive is not None else JsonlArchive()
+    rules = list(rules)
+    report = MaintenanceReport()
+    temp_path: Path = archive.path.with_suffix(archive.path.suffix + ".tmp")
+
+    with archive.lock:
+        with open(temp_path, "wb") as file:
+            for record in archive.records():
+                report.read += 1
+                result: Optional[Record] = record
+                for rule in rules:
+                    result = rule(result)
+                    if result is None:
+                        break
+                if result is None:
+                    report.dropped += 1
+                    continue
+                if result != record:
+                    report.changed += 1
+                file.write((json.dumps(result, sort_keys=False) + "\n").encode("utf-8"))
+            _fsync(file)
+
+        if dry_run or (report.dropped == 0 and report.changed == 0):
+            temp_path.unlink()
+            return report
+        os.replace(temp_path, archive.path)
+        archive.index_path.unlink(missing_ok=True)
+        archive._offsets = None
+
+    logger.info(f"Rewrote '{archive.path.name}'.\n{report}")
+    return report
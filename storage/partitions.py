@@ -0,0 +1,151 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from constants import PathManager
+from logger import Logger
+
+from .archive import JsonlArchive, Record, iter_legacy_json
+from .logids import parse_log_id
+
+logger = Logger()
+
+_FLAT_NAMES: tuple[str, ...] = (
+    "_output_JSON.json",
+    "_output_JSON.jsonl",
+    "_output_TSV.txt",
+    "_serial_numbers.yaml",
+)
+
+
+def archive_for(fiscal_year: int) -> JsonlArchive:
+    partition: Path = PathManager.partition(fiscal_year)
+    return JsonlArchive(
+        partition / "_output_JSON.jsonl",
+        partition / "_output_JSON.idx",
+        partition / "_output_JSON.json",
+    )
+
+
+def fiscal_year_of_log_id(log_id: str) -> Optional[int]:
+    """'25-IND-042' -> 2025; None for IDs without a year prefix."""
+    parsed = parse_log_id(log_id)
+    return 2000 + int(parsed[0]) if parsed else None
+
+
+def _split_flat_archive() -> None:
+    """
+    Moves a pre-partitioning archive into per-year partitions, routing each
+    record by its log-ID prefix. Records without one go to the current year.
+    """
+    local_dir: Path = PathManager.local_dir
+    flat_jsonl: Path = local_dir / "_output_JSON.jsonl"
+    flat_json: Path = local_dir / "_output_JSON.json"
+    if flat_jsonl.exists():
+        source = JsonlArchive(
+            flat_jsonl, local_dir / "_output_JSON.idx", flat_json
+        ).records()
+    elif flat_json.exists():
+        source = (record for _, record in iter_legacy_json(flat_json))
+    else:
+        return
+
+    archives: dict[int, JsonlArchive] = {}
+    batches: dict[int, list[Record]] = {}
+    count: int = 0
+    for record in source:
+        fiscal_year: int = (
+            fiscal_year_of_log_id(str(record.get("log_id"))) or PathManager.fiscal_year
+        )
+        if fiscal_year not in archives:
+            PathManager.partition(fiscal_year).mkdir(parents=True, exist_ok=True)
+            archives[fiscal_year] = archive_for(fiscal_year)
+            batches[fiscal_year] = []
+        batches[fiscal_year].append(record)
+        if len(batches[fiscal_year]) == 1000:
+            archives[fiscal_year].append_many(batches[fiscal_year])
+            batches[fiscal_year] = []
+        count += 1
+    for fiscal_year, batch in batches.items():
+        archives[fiscal_year].append_many(batch)
+    logger.info(f"Split {count} archived records into {len(archives)} fiscal years.")
+
+
+def migrate_flat_layout() -> None:
+    """
+    One-time move from the single un-partitioned set of files. The serial
+    numbers and TSV belong to the year that was current, so they move there;
+    the flat files are kept with a ".migrated" suffix.
+    """
+    flat_paths: list[Path] = [PathManager.local_dir / name for name in _FLAT_NAMES]
+    if not any(path.exists() for path in flat_paths):
+        return
+    _split_flat_archive()
+    for path in flat_paths:
+        if not path.exists():
+            continue
+        target: Path = PathManager.partition_dir / path.name
+        if path.suffix in (".txt", ".yaml") and not target.exists():
+            os.replace(path, target)
+        else:
+            os.replace(path, path.with_name(path.name + ".migrated"))
+    for name in ("_output_JSON.idx", "_log_ids.txt", "_log_ids.lock"):
+        (PathManager.local_dir / name).unlink(missing_ok=True)
+
+
+def ensure_current_partition() -> bool:
+    """
+    Points PathManager at the current fiscal year, migrating the flat layout on
+    first use. Returns True when this call rolled over to a new year.
+    """
+    rolled_over: bool = PathManager.rollover()
+    PathManager.partition_dir.mkdir(parents=True, exist_ok=True)
+    migrate_flat_layout()
+    if rolled_over:
+        logger.info(f"Rolled over to FY {PathManager.fiscal_year}.")
+    return rolled_over
+
+
+@contextmanager
+def using_partition(fiscal_year: int) -> Iterator[None]:
+    """Points PathManager at another fiscal year's partition for the block."""
+    current: int = PathManager.fiscal_year
+    PathManager.use_fiscal_year(fiscal_year)
+    try:
+        yield
+    finally:
+        PathManager.use_fiscal_year(current)
+
+
+class MergedArchive:
+    """
+    Read-only view over every fiscal-year partition. Lookups by log ID go
+    straight to the partition named by the ID's prefix; scans run oldest
+    year first. Writes always go to the current partition's JsonlArchive.
+    """
+
+    def __init__(self):
+        self.archives: dict[int, JsonlArchive] = {
+            fiscal_year: archive_for(fiscal_year)
+            for fiscal_year in PathManager.partitions()
+        }
+
+    def _archive(self, log_id: str) -> Optional[JsonlArchive]:
+        fiscal_year = fiscal_year_of_log_id(log_id)
+        return self.archives.get(fiscal_year) if fiscal_year else None
+
+    def __contains__(self, log_id: str) -> bool:
+        archive = self._archive(log_id)
+        return archive is not None and log_id in archive
+
+    def __len__(self) -> int:
+        return sum(len(archive) for archive in self.archives.values())
+
+    def get(self, log_id: str) -> Optional[Record]:
+        archive = self._archive(log_id)
+        return archive.get(log_id) if archive is not None else None
+
+    def records(self) -> Iterator[Record]:
+        for archive in self.archives.values():
+            yield from archive.records()
@@ -0,0 +1,70 @@
+import ctypes
+import hashlib
+import mmap
+import os
+import shutil
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
+
+import fitz
+
+_DRIVE_REMOTE: int = 4
+
+
+def is_remote(path: Path) -> bool:
+    """True for UNC paths and mapped network drives such as X:."""
+    path = Path(path)
+    if str(path).startswith("\\\\"):
+        return True
+    if os.name != "nt" or not path.drive:
+        return False
+    drive_type = ctypes.windll.kernel32.GetDriveTypeW(f"{path.drive}\\")
+    return drive_type == _DRIVE_REMOTE
+
+
+def read_file(path: Path) -> bytes:
+    """
+    Reads the whole file in one sequential pass. Local files are copied out of a
+    short-lived read-only mapping; network files are read in a single bulk read,
+    which the share serves far faster than fitz's small random reads.
+    """
+    with open(path, "rb", buffering=0) as file:
+        if is_remote(path) or os.fstat(file.fileno()).st_size == 0:
+            return file.readall()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[:]
+
+
+@dataclass
+class PdfBuffer:
+    """
+    One PDF held in memory. Triage, extraction, hashing and the archive copy all
+    use these bytes, so the file on the share is read exactly once.
+    """
+
+    path: Path
+    data: bytes
+
+    @classmethod
+    def read(cls, path: Path) -> "PdfBuffer":
+        path = Path(path)
+        return cls(path, read_file(path))
+
+    @cached_property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.data).hexdigest()
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def open(self) -> fitz.Document:
+        return fitz.open(stream=self.data, filetype="pdf")
+
+    def write_to(self, target_path: Path, stat_source: Optional[Path] = None) -> None:
+        """Writes the buffered bytes to `target_path`, copying metadata like shutil.copy2."""
+        with open(target_path, "wb") as file:
+            file.write(self.data)
+        shutil.copystat(stat_source or self.path, target_path)
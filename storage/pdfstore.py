@@ -0,0 +1,165 @@
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+from constants import PathManager
+from logger import Logger
+
+from .filelock import FileLock
+
+logger = Logger()
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def matches(path: Path, size: int, digest: str) -> bool:
+    """Size first, so a short copy is caught without reading it back."""
+    return path.exists() and path.stat().st_size == size and file_sha256(path) == digest
+
+
+class ContentStore:
+    """
+    Archived PDFs stored once per distinct content, under _objects/<ab>/<sha256>.pdf
+    in the file archive folder.
+
+    The readable "log_id _ org _ name _ date.pdf" names are kept in an
+    append-only _index.tsv ("sha256<TAB>name" lines), read once per store and
+    then kept in memory. Each name is also hard-linked to its object, so the
+    folder stays browsable at no extra storage cost; where the share refuses
+    hard links the names live in the index only and resolve() finds the
+    object. A resubmitted or re-run PDF with the same bytes only adds a name;
+    nothing is transferred or stored again.
+    """
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root: Path = Path(root) if root else PathManager.file_archive_dir
+        self.objects_dir: Path = self.root / "_objects"
+        self.index_path: Path = self.root / "_index.tsv"
+        self._names: Optional[dict[str, str]] = None
+        self._names_lock = threading.Lock()
+        self._links: bool = True
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.pdf"
+
+    def _read_index(self) -> dict[str, str]:
+        names: dict[str, str] = {}
+        if not self.index_path.exists():
+            return names
+        with open(self.index_path, "r", encoding="utf-8") as file:
+            for line in file:
+                digest, _, name = line.rstrip("\n").partition("\t")
+                if digest and name:
+                    names[name] = digest
+        return names
+
+    def names(self) -> dict[str, str]:
+        """Readable name -> content hash; a name indexed twice resolves to its latest hash."""
+        with self._names_lock:
+            if self._names is None:
+                self._names = self._read_index()
+            return dict(self._names)
+
+    def resolve(self, name: str) -> Optional[Path]:
+        digest = self.names().get(name)
+        return self.object_path(digest) if digest else None
+
+    def _store_object(
+        self, digest: str, size: int, write: Callable[[Path], None]
+    ) -> bool:
+        """Writes the object unless it is already stored; returns True if it was written."""
+        object_path: Path = self.object_path(digest)
+        # Objects are only ever renamed into place after verification, so a
+        # matching size is enough to trust one that already exists.
+        if object_path.exists() and object_path.stat().st_size == size:
+            return False
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path: Path = object_path.with_name(f".{uuid.uuid4().hex}.tmp")
+        try:
+            write(temp_path)
+            if not matches(temp_path, size, digest):
+                raise OSError(f"The archived copy of '{digest}' does not match.")
+            os.replace(temp_path, object_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+        return True
+
+    def _link(self, name: str, digest: str) -> None:
+        """Gives the object its readable name as a hard link, where the share allows one."""
+        named_path: Path = self.root / name
+        if not self._links or named_path.exists():
+            return
+        try:
+            os.link(self.object_path(digest), named_path)
+        except OSError as e:
+            self._links = False
+            logger.warning(
+                f"Hard links are not available in '{self.root}'; archived names are "
+                f"kept in '{self.index_path.name}' only. {e}"
+            )
+
+    def _index(self, name: str, digest: str) -> None:
+        with self._names_lock:
+            if self._names is None:
+                self._names = self._read_index()
+            if self._names.get(name) == digest:
+                return
+            # Another process may index the same name meanwhile; a repeated
+            # line is harmless because the latest one wins.
+            with FileLock(self.index_path.with_suffix(".lock")):
+                with open(self.index_path, "a", encoding="utf-8") as file:
+                    file.write(f"{digest}\t{name}\n")
+                    file.flush()
+                    os.fsync(file.fileno())
+            self._names[name] = digest
+
+    def put(
+        self, name: str, digest: str, size: int, write: Callable[[Path], None]
+    ) -> Path:
+        """
+        Stores the PDF under `name`. `write(path)` is only called when no object
+        with this hash exists yet. Running put() twice is harmless.
+        """
+        if self._store_object(digest, size, write):
+            logger.info(f"Stored '{name}' in the file archive.")
+        else:
+            logger.info(f"'{name}' matches an archived PDF; only the name was added.")
+        self._index(name, digest)
+        self._link(name, digest)
+        return self.object_path(digest)
+
+    def import_existing(self) -> int:
+        """
+        Indexes the plain PDFs already in the folder and stores each distinct
+        content once: the first copy becomes the object and later copies are
+        removed. Every name is then linked back to its object, or, where the
+        share refuses hard links, kept in the index only. Returns the number
+        of files stored.
+        """
+        stored: int = 0
+        for path in sorted(self.root.glob("*.pdf")):
+            if path.stat().st_nlink > 1:
+                continue  # Already a link to an object.
+            digest: str = file_sha256(path)
+            object_path: Path = self.object_path(digest)
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            # Indexed first, so an interrupted import never loses a name.
+            self._index(path.name, digest)
+            if object_path.exists():
+                path.unlink()
+            else:
+                os.replace(path, object_path)
+            stored += 1
+        for name, digest in self.names().items():
+            self._link(name, digest)
+        logger.info(f"Stored {stored} archived PDFs in '{self.objects_dir.name}'.")
+        return stored
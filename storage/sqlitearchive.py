@@ -0,0 +1,243 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from constants import PathManager
+from logger import Logger
+
+from .archive import JsonlArchive, Record, iter_legacy_json
+
+logger = Logger()
+
+# find()'s default for consultant, since None is itself a value to match.
+_ANY = object()
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS awards (
+    log_id TEXT PRIMARY KEY,
+    category TEXT,
+    type TEXT,
+    funding_org TEXT,
+    employee_name TEXT,
+    group_name TEXT,
+    consultant TEXT,
+    monetary_amount INTEGER,
+    time_off_amount INTEGER,
+    date_received TEXT,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS employees (
+    log_id TEXT NOT NULL REFERENCES awards(log_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    org TEXT,
+    pay_plan TEXT,
+    monetary_amount INTEGER,
+    time_off_amount INTEGER,
+    PRIMARY KEY (log_id, position)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE INDEX IF NOT EXISTS awards_funding_org ON awards(funding_org);
+CREATE INDEX IF NOT EXISTS awards_employee_name ON awards(employee_name);
+CREATE INDEX IF NOT EXISTS awards_date_received ON awards(date_received);
+CREATE INDEX IF NOT EXISTS employees_name ON employees(name);
+"""
+
+_AWARD_COLUMNS: tuple[str, ...] = (
+    "log_id",
+    "category",
+    "type",
+    "funding_org",
+    "employee_name",
+    "group_name",
+    "consultant",
+    "monetary_amount",
+    "time_off_amount",
+    "date_received",
+)
+
+
+class SqliteArchive:
+    """
+    A queryable copy of the award archive in SQLite (WAL mode).
+
+    The JSONL archive stays the record of truth. sync() loads whatever was
+    appended to it since the last sync, using the byte offset kept in `meta`,
+    so the database never needs a full rebuild to stay current.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path: Path = Path(path) if path else PathManager.sqlite_archive_path
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "SqliteArchive":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
+
+    @staticmethod
+    def _employees(record: Record) -> list[dict]:
+        employees = record.get("employees")
+        if isinstance(employees, dict):
+            return list(employees.values())
+        return [
+            {
+                "name": record.get("employee_name"),
+                "org": record.get("employee_org"),
+                "pay_plan": record.get("employee_pay_plan"),
+                "monetary_amount": record.get("monetary_amount"),
+                "time_off_amount": record.get("time_off_amount"),
+            }
+        ]
+
+    def _upsert(self, records: Iterable[Record]) -> int:
+        count: int = 0
+        for record in records:
+            log_id = record.get("log_id")
+            if log_id is None:
+                continue
+            self.connection.execute("DELETE FROM awards WHERE log_id = ?", (log_id,))
+            values = [record.get(column) for column in _AWARD_COLUMNS]
+            self.connection.execute(
+                f"INSERT INTO awards ({', '.join(_AWARD_COLUMNS)}, record) "
+                f"VALUES ({', '.join('?' * (len(_AWARD_COLUMNS) + 1))})",
+                values + [json.dumps(record, sort_keys=False)],
+            )
+            self.connection.executemany(
+                "INSERT INTO employees (log_id, position, name, org, pay_plan, "
+                "monetary_amount, time_off_amount) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        log_id,
+                        position,
+                        employee.get("name"),
+                        employee.get("org"),
+                        employee.get("pay_plan"),
+                        employee.get("monetary_amount"),
+                        employee.get("time_off_amount"),
+                    )
+                    for position, employee in enumerate(self._employees(record), 1)
+                ],
+            )
+            count += 1
+        return count
+
+    def import_json(self, json_path: Optional[Path] = None) -> int:
+        """Loads every record of a legacy pretty-printed JSON archive."""
+        json_path = Path(json_path) if json_path else PathManager.json_archive_path
+        records = (record for _, record in iter_legacy_json(json_path))
+        with self.connection:
+            count = self._upsert(records)
+        logger.info(f"Imported {count} records from '{json_path.name}'.")
+        return count
+
+    def rebuild(self, archive: Optional[JsonlArchive] = None) -> int:
+        """Reloads every record, for after the JSONL archive was rewritten in place."""
+        with self.connection:
+            self.connection.execute("DELETE FROM awards")
+            self._set_meta("jsonl_offset", "0")
+        return self.sync(archive)
+
+    def sync(self, archive: Optional[JsonlArchive] = None) -> int:
+        """Imports the records appended to the JSONL archive since the last sync."""
+        archive = archive if archive is not None else JsonlArchive()
+        if not archive.path.exists():
+            return 0
+        size: int = archive.path.stat().st_size
+        offset: int = int(self._meta("jsonl_offset") or 0)
+        records: list[Record] = []
+        with self.connection:
+            if offset > size:
+                # The archive was replaced; start over from its first line.
+                self.connection.execute("DELETE FROM awards")
+                offset = 0
+            with open(archive.path, "rb") as file:
+                file.seek(offset)
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    records.append(json.loads(line))
+                    offset += len(line)
+            self._upsert(records)
+            self._set_meta("jsonl_offset", str(offset))
+        return len(records)
+
+    def __contains__(self, log_id: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM awards WHERE log_id = ?", (log_id,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM awards").fetchone()[0]
+
+    def get(self, log_id: str) -> Optional[Record]:
+        row = self.connection.execute(
+            "SELECT record FROM awards WHERE log_id = ?", (log_id,)
+        ).fetchone()
+        return json.loads(row["record"]) if row else None
+
+    def find(
+        self,
+        funding_org: Optional[str] = None,
+        employee_name: Optional[str] = None,
+        consultant: Optional[str] | object = _ANY,
+        received_from: Optional[str] = None,
+        received_to: Optional[str] = None,
+    ) -> list[Record]:
+        """
+        Awards matching every given filter. `employee_name` also matches group
+        members; dates are inclusive "YYYY-MM-DD" strings. consultant=None
+        matches awards with no consultant, like the in-memory archive does.
+        """
+        clauses: list[str] = []
+        params: list[str] = []
+        if funding_org is not None:
+            clauses.append("funding_org = ?")
+            params.append(funding_org)
+        if employee_name is not None:
+            clauses.append(
+                "(employee_name = ? OR log_id IN "
+                "(SELECT log_id FROM employees WHERE name = ?))"
+            )
+            params.extend([employee_name, employee_name])
+        if consultant is None:
+            clauses.append("consultant IS NULL")
+        elif consultant is not _ANY:
+            clauses.append("consultant = ?")
+            params.append(consultant)
+        if received_from is not None:
+            clauses.append("date_received >= ?")
+            params.append(received_from)
+        if received_to is not None:
+            clauses.append("date_received <= ?")
+            params.append(received_to)
+        where: str = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connection.execute(
+            f"SELECT record FROM awards {where} ORDER BY log_id", params
+        )
+        return [json.loads(row["record"]) for row in rows]
+
+    def records(self) -> Iterator[Record]:
+        for row in self.connection.execute("SELECT record FROM awards ORDER BY log_id"):
+            yield json.loads(row["record"])
@@ -0,0 +1,295 @@
+import json
+import os
+import re
+import warnings
+from pathlib import Path
+from typing import Optional
+
+import openpyxl
+import yaml
+from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
+
+from constants import AwardTracker, PathManager
+from logger import Logger
+from utils import IDManager
+
+from .tsv import TSV_COLUMNS
+
+logger = Logger()
+
+
+def _serial(value) -> Optional[int]:
+    """'25-IND-042' (or 42) -> 42."""
+    match = re.search(r"(\d+)\s*$", str(value)) if value is not None else None
+    return int(match.group(1)) if match else None
+
+
+class TrackerSync:
+    """
+    Merges the latest serials recorded in the tracker workbook into the serial
+    numbers file.
+
+    The workbook is read in read-only, values-only mode and only the
+    data_entry sheet's two serial cells are touched. The values read are
+    cached against the workbook's mtime and size, so an unchanged tracker
+    is never opened at all.
+    """
+
+    def __init__(
+        self, workbook_path: Optional[Path] = None, cache_path: Optional[Path] = None
+    ):
+        self.workbook_path: Path = (
+            Path(workbook_path) if workbook_path else AwardTracker.file_path
+        )
+        self.cache_path: Path = (
+            Path(cache_path) if cache_path else PathManager.tracker_sync_path
+        )
+
+    def _signature(self) -> dict[str, str | int]:
+        stat = self.workbook_path.stat()
+        return {
+            "path": str(self.workbook_path),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    def _cached(self, signature: dict) -> Optional[dict[str, int]]:
+        if not self.cache_path.exists():
+            return None
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as file:
+                cached: dict = json.load(file)
+        except ValueError:
+            return None
+        if cached.get("signature") != signature:
+            return None
+        return cached.get("serials")
+
+    def _store(self, signature: dict, serials: dict[str, int]) -> None:
+        temp_path: Path = self.cache_path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"signature": signature, "serials": serials}, file, indent=4)
+        os.replace(temp_path, self.cache_path)
+
+    def read_workbook(self) -> dict[str, int]:
+        """The IND and GRP serials in the tracker's data_entry sheet."""
+        coords: dict[str, str] = {
+            "IND": AwardTracker.ind_coord,
+            "GRP": AwardTracker.grp_coord,
+        }
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+            workbook = openpyxl.load_workbook(
+                self.workbook_path, read_only=True, data_only=True, keep_links=False
+            )
+        cells: dict[str, tuple[int, int]] = {}
+        for category, coord in coords.items():
+            column, row = coordinate_from_string(coord)
+            cells[category] = (row, column_index_from_string(column))
+        rows = [row for row, _ in cells.values()]
+        columns = [column for _, column in cells.values()]
+        try:
+            sheet = workbook[AwardTracker.sheet_name]
+            block = list(
+                sheet.iter_rows(
+                    min_row=min(rows),
+                    max_row=max(rows),
+                    min_col=min(columns),
+                    max_col=max(columns),
+                    values_only=True,
+                )
+            )
+        finally:
+            workbook.close()
+
+        serials: dict[str, int] = {}
+        for category, (row, column) in cells.items():
+            values = block[row - min(rows)] if row - min(rows) < len(block) else ()
+            index: int = column - min(columns)
+            serial = _serial(values[index] if index < len(values) else None)
+            if serial is None:
+                raise ValueError(f"No serial number in {coords[category]}.")
+            serials[category] = serial
+        return serials
+
+    def tracker_serials(self) -> dict[str, int]:
+        signature = self._signature()
+        serials = self._cached(signature)
+        if serials is None:
+            serials = self.read_workbook()
+            self._store(signature, serials)
+        return serials
+
+    def sync(self) -> dict[str, int]:
+        """
+        Raises each serial in the serial numbers file to at least the tracker's
+        value and returns the merged serials. The file is only rewritten when a
+        value changes.
+        """
+        tracker: dict[str, int] = self.tracker_serials()
+        with IDManager.registry().lock:
+            serial_numbers: dict[str, int] = IDManager.load_SN_data()
+            merged: dict[str, int] = dict(serial_numbers)
+            for category, serial in tracker.items():
+                merged[category] = max(merged.get(category, serial), serial)
+            if merged != serial_numbers:
+                temp_path: Path = PathManager.serial_path.with_suffix(".yaml.tmp")
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    yaml.safe_dump(merged, file, indent=4, sort_keys=False)
+                os.replace(temp_path, PathManager.serial_path)
+        return merged
+
+
+def _cell(value: str | int | None) -> str | int | None:
+    """An award field as a worksheet value: blanks are empty and TSV quoting is removed."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str) and len(value) > 1 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('""', '"')
+    return value
+
+
+class TrackerExporter:
+    """
+    Appends awards to the tracker workbook's log sheet, in the TSV column order.
+
+    Rows are buffered per log ID and written by flush() in a single load and
+    save of the workbook. The .xlsm macros are kept, and any log ID already in
+    the sheet's first column is skipped. The workbook is saved to a temp file
+    that replaces the original, so a failed save leaves the tracker untouched.
+    Rows a failed flush could not write are kept in a pending file and picked
+    up by the next exporter.
+
+    Unless given, both paths follow the current fiscal-year partition, so a
+    long-running exporter moves to the new year's tracker at rollover.
+    """
+
+    def __init__(
+        self, workbook_path: Optional[Path] = None, pending_path: Optional[Path] = None
+    ):
+        self._workbook_path: Optional[Path] = Path(workbook_path) if workbook_path else None
+        self._pending_path: Optional[Path] = Path(pending_path) if pending_path else None
+        self._buffer: dict[str, list[list[str | int | None]]] = {}
+        self._buffer_path: Optional[Path] = None
+        self._switch()
+
+    @property
+    def workbook_path(self) -> Path:
+        return self._workbook_path or AwardTracker.file_path
+
+    @property
+    def pending_path(self) -> Path:
+        return self._pending_path or PathManager.tracker_pending_path
+
+    def _switch(self) -> None:
+        """
+        Loads the current partition's pending rows when the partition changes.
+        Rows still buffered for the previous year stay in its pending file.
+        """
+        if self._buffer_path == self.pending_path:
+            return
+        if self._buffer:
+            self._save_pending()
+            logger.warning(
+                f"{len(self._buffer)} awards are kept for the previous year's tracker "
+                f"in '{self._buffer_path}'."
+            )
+        self._buffer_path = self.pending_path
+        self._buffer = self._load_pending()
+
+    def _load_pending(self) -> dict[str, list[list[str | int | None]]]:
+        if not self._buffer_path.exists():
+            return {}
+        with open(self._buffer_path, "r", encoding="utf-8") as file:
+            pending: dict = json.load(file)
+        logger.info(f"{len(pending)} awards from an earlier run are waiting for the tracker.")
+        return pending
+
+    def _save_pending(self) -> None:
+        temp_path: Path = self._buffer_path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self._buffer, file, indent=4)
+        os.replace(temp_path, self._buffer_path)
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(self, log_id: str, rows: list[list[str | int | None]]) -> None:
+        """Buffers an award's TSV cells (one row per employee for group awards)."""
+        self._switch()
+        self._buffer[log_id] = [[_cell(value) for value in row] for row in rows]
+
+    def flush(self) -> int:
+        """
+        Writes every buffered award not yet in the sheet; returns how many were
+        added. On failure the buffer is saved to the pending file and the error
+        re-raised.
+        """
+        self._switch()
+        if not self._buffer:
+            return 0
+        try:
+            added: int = self._write()
+        except Exception:
+            self._save_pending()
+            raise
+        self._buffer = {}
+        self._buffer_path.unlink(missing_ok=True)
+        logger.info(f"Added {added} awards to '{self.workbook_path.name}'.")
+        return added
+
+    def _write(self) -> int:
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
+            workbook = openpyxl.load_workbook(
+                self.workbook_path,
+                keep_vba=self.workbook_path.suffix.lower() == ".xlsm",
+            )
+        try:
+            if AwardTracker.log_sheet_name in workbook.sheetnames:
+                sheet = workbook[AwardTracker.log_sheet_name]
+            else:
+                sheet = workbook.create_sheet(AwardTracker.log_sheet_name)
+                sheet.append(list(TSV_COLUMNS))
+            existing: set[str] = {
+                str(value)
+                for (value,) in sheet.iter_rows(
+                    min_row=AwardTracker.log_header_rows + 1,
+                    max_col=1,
+                    values_only=True,
+                )
+                if value is not None
+            }
+            added: int = 0
+            for log_id, rows in self._buffer.items():
+                if log_id in existing:
+                    logger.warning(f"'{log_id}' is already in the tracker; skipped.")
+                    continue
+                for row in rows:
+                    sheet.append(row)
+                existing.add(log_id)
+                added += 1
+
+            if added:
+                temp_path: Path = self.workbook_path.with_name(
+                    f"~{self.workbook_path.name}"
+                )
+                workbook.save(temp_path)
+                os.replace(temp_path, self.workbook_path)
+        finally:
+            workbook.close()
+        return added
+
+
+def update_serial_numbers() -> None:
+    try:
+        serials = TrackerSync().sync()
+        print(
+            f"\n"
+            "Updated serial_numbers.yaml\n"
+            f"IND: {serials.get('IND')}\n"
+            f"GRP: {serials.get('GRP')}\n"
+        )
+    except Exception as e:
+        print(f"Unable to update serial_numbers.yaml. {e}")
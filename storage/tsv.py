@@ -0,0 +1,262 @@
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from constants import PathManager
+from logger import Logger
+
+from .archive import JsonlArchive, Record, _fsync
+
+logger = Logger()
+
+# The layout pasted into the tracker workbook; the file itself has no header.
+TSV_COLUMNS: tuple[str, ...] = (
+    "log_id",
+    "date_received",
+    "date_processed",
+    "category",
+    "type",
+    "employee_name",
+    "monetary_amount",
+    "time_off_amount",
+    "pay_plan",
+    "org",
+    "supervisor_name",
+    "group_name",
+    "nominator_name",
+    "funding_org",
+    "mb_division",
+    "justification",
+    "value",
+    "extent",
+)
+
+
+def format_row(items: Iterable[str | int | None]) -> str:
+    return "\t".join("-" if item is None else str(item) for item in items)
+
+
+def _quote_open(line: str, quoted: bool) -> bool:
+    """
+    Whether a quoted field is still open at the end of `line`, with csv rules:
+    a quote opens a field only at its start and "" inside one is a literal quote.
+    """
+    at_field_start: bool = not quoted
+    index: int = 0
+    while index < len(line):
+        char: str = line[index]
+        if quoted and char == '"':
+            if line[index + 1 : index + 2] == '"':
+                index += 2
+                continue
+            quoted = False
+        elif not quoted and char == '"' and at_field_start:
+            quoted = True
+        at_field_start = char == "\t" and not quoted
+        index += 1
+    return quoted
+
+
+def rows_from_record(record: Record) -> list[str]:
+    """
+    Rebuilds an award's TSV lines from its archive record: one per employee
+    for group awards. The archive keeps only a word count for justifications.
+    """
+    employees = record.get("employees")
+    if not isinstance(employees, dict):
+        employees = {
+            "1": {
+                "name": record.get("employee_name"),
+                "monetary_amount": record.get("monetary_amount"),
+                "time_off_amount": record.get("time_off_amount"),
+                "pay_plan": record.get("employee_pay_plan"),
+                "org": record.get("employee_org"),
+                "supervisor_name": record.get("employee_supervisor_name"),
+            }
+        }
+    return [
+        format_row(
+            [
+                record.get("log_id"),
+                record.get("date_received"),
+                "",
+                record.get("category"),
+                record.get("type"),
+                employee.get("name"),
+                employee.get("monetary_amount"),
+                employee.get("time_off_amount"),
+                employee.get("pay_plan"),
+                employee.get("org"),
+                employee.get("supervisor_name"),
+                record.get("group_name"),
+                record.get("nominator_name"),
+                record.get("funding_org"),
+                record.get("mb_division") or "",
+                record.get("justification"),
+                record.get("value"),
+                record.get("extent"),
+            ]
+        )
+        for employee in employees.values()
+    ]
+
+
+class TsvWriter:
+    """
+    Buffers an award's TSV rows until flush(), which appends the whole batch
+    with one write. A log ID already in the file or the buffer is skipped, so
+    re-runs never duplicate rows. Group awards keep all their rows together.
+
+    A row can span several lines: the justification is a quoted field with
+    line breaks in it, so the file is scanned quote-aware into log_id -> byte
+    range blocks rather than line by line.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path: Path = Path(path) if path else PathManager.tsv_output_path
+        self._blocks: Optional[dict[str, tuple[int, int]]] = None
+        self._buffer: dict[str, str] = {}
+
+    @property
+    def blocks(self) -> dict[str, tuple[int, int]]:
+        """(start, end) byte offsets of each log ID's first run of rows in the file."""
+        if self._blocks is None:
+            self._blocks = dict(self._scan())
+        return self._blocks
+
+    def _scan(self, offset: int = 0) -> Iterator[tuple[str, tuple[int, int]]]:
+        """Yields each log ID's first block from `offset`, which must start a row."""
+        if not self.path.exists():
+            return
+        seen: set[str] = set()
+        current: Optional[str] = None
+        start: int = offset
+        row_end: int = offset
+        quoted: bool = False
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                text: str = line.decode("utf-8")
+                if not quoted:
+                    log_id: str = text.split("\t", 1)[0].strip()
+                    if log_id != current:
+                        if current is not None and current not in seen:
+                            seen.add(current)
+                            yield current, (start, row_end)
+                        current, start = log_id, offset
+                quoted = _quote_open(text, quoted)
+                offset += len(line)
+                if not quoted:
+                    row_end = offset
+        # A row cut off mid-field (a torn append) is left out of its block.
+        if current is not None and current not in seen and row_end > start:
+            yield current, (start, row_end)
+
+    def __contains__(self, log_id: str) -> bool:
+        return log_id in self._buffer or log_id in self.blocks
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def add(self, log_id: str, rows: str | list[str]) -> bool:
+        """
+        Buffers the award's rows, kept as the text they were given; returns False
+        for a log ID already written.
+        """
+        if log_id in self:
+            logger.warning(f"'{log_id}' is already in '{self.path.name}'; row skipped.")
+            return False
+        text: str = rows if isinstance(rows, str) else "\n".join(rows)
+        self._buffer[log_id] = text.rstrip("\n") + "\n"
+        return True
+
+    def clear(self) -> None:
+        """Drops buffered rows that will not be written."""
+        self._buffer = {}
+
+    def _encoded(self) -> bytes:
+        return "".join(self._buffer.values()).encode("utf-8")
+
+    def _record_blocks(self, offset: int) -> None:
+        if self._blocks is None:
+            return
+        for log_id, text in self._buffer.items():
+            end: int = offset + len(text.encode("utf-8"))
+            self._blocks[log_id] = (offset, end)
+            offset = end
+
+    def flush(self) -> int:
+        """Appends every buffered row with one write and one fsync."""
+        if not self._buffer:
+            return 0
+        count: int = len(self._buffer)
+        with open(self.path, "ab") as file:
+            offset: int = file.tell()
+            file.write(self._encoded())
+            _fsync(file)
+        self._record_blocks(offset)
+        self._buffer = {}
+        logger.info(f"'{self.path.name}' updated with {count} awards.")
+        return count
+
+    def stage(self, segment_path: Path) -> int:
+        """Like JsonlArchive.stage: writes the buffer to a segment, returns the base size."""
+        with open(segment_path, "wb") as file:
+            file.write(self._encoded())
+            _fsync(file)
+        self._buffer = {}
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def apply_segment(self, segment_path: Path, base_size: int) -> None:
+        """Appends a staged segment at `base_size`. Running it twice is harmless."""
+        if not Path(segment_path).exists():
+            return
+        with open(self.path, "ab") as file:
+            file.truncate(base_size)
+            with open(segment_path, "rb") as segment:
+                file.write(segment.read())
+            _fsync(file)
+        Path(segment_path).unlink()
+        if self._blocks is not None:
+            for log_id, block in self._scan(base_size):
+                self._blocks.setdefault(log_id, block)
+
+    def regenerate(self, archive: Optional[JsonlArchive] = None) -> int:
+        """
+        Rewrites the file from the archive in one streaming pass, in archive
+        order with one block per log ID. Rows already in the file are copied
+        byte for byte, multi-line justifications included; the rest are
+        rebuilt from the archive records.
+        """
+        archive = archive if archive is not None else JsonlArchive()
+        blocks: dict[str, tuple[int, int]] = self.blocks
+        temp_path: Path = self.path.with_suffix(self.path.suffix + ".tmp")
+        count: int = 0
+        rebuilt: int = 0
+        source = open(self.path, "rb") if self.path.exists() else None
+        try:
+            with open(temp_path, "wb") as file:
+                for record in archive.records():
+                    log_id: str = str(record.get("log_id"))
+                    block = blocks.get(log_id)
+                    if block is not None and source is not None:
+                        source.seek(block[0])
+                        file.write(source.read(block[1] - block[0]))
+                    else:
+                        rows = rows_from_record(record)
+                        file.write("".join(f"{row}\n" for row in rows).encode("utf-8"))
+                        rebuilt += 1
+                    count += 1
+                _fsync(file)
+        finally:
+            if source is not None:
+                source.close()
+        os.replace(temp_path, self.path)
+        self._blocks = None
+        logger.info(
+            f"'{self.path.name}' regenerated: {count} awards, {rebuilt} rebuilt from the archive."
+        )
+        return count
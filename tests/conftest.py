@@ -0,0 +1,38 @@
+import pytest
+
+from constants import AwardTracker, PathManager
+from utils import IDManager
+
+_PARTITION_PATHS = [
+    "fiscal_year",
+    "partition_dir",
+    "file_archive_dir",
+    "json_archive_path",
+    "jsonl_archive_path",
+    "jsonl_index_path",
+    "journal_dir",
+    "log_id_registry_path",
+    "serial_path",
+    "sqlite_archive_path",
+    "tracker_path",
+    "tracker_pending_path",
+    "tracker_sync_path",
+    "tsv_output_path",
+]
+
+
+@pytest.fixture(autouse=True)
+def log_to_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(PathManager, "logger_path", tmp_path / "test.log")
+
+
+@pytest.fixture
+def isolated_partition(tmp_path, monkeypatch):
+    """Every PathManager path, and the log-ID registry, under tmp_path for FY 2025."""
+    for name in _PARTITION_PATHS:
+        monkeypatch.setattr(PathManager, name, getattr(PathManager, name))
+    monkeypatch.setattr(AwardTracker, "file_path", AwardTracker.file_path)
+    monkeypatch.setattr(IDManager, "_registry", None)
+    monkeypatch.setattr(PathManager, "local_dir", tmp_path)
+    PathManager.use_fiscal_year(2025)
+    PathManager.file_archive_dir = tmp_path / "Archive"
@@ -0,0 +1,58 @@
+import fitz
+
+from models.acroform import clear_fields, field_names, read_fields, read_widgets
+
+
+def make_filled_form() -> fitz.Document:
+    doc = fitz.open()
+    doc.new_page()
+    doc.new_page()
+    fields = [
+        (0, "Employee Name", fitz.PDF_WIDGET_TYPE_TEXT, "Doe, Jane (PM)"),
+        (0, "Blank", fitz.PDF_WIDGET_TYPE_TEXT, ""),
+        (1, "Approved", fitz.PDF_WIDGET_TYPE_CHECKBOX, True),
+        (1, "Declined", fitz.PDF_WIDGET_TYPE_CHECKBOX, False),
+    ]
+    for idx, (page_number, name, field_type, value) in enumerate(fields):
+        widget = fitz.Widget()
+        widget.field_name = name
+        widget.field_type = field_type
+        widget.field_value = value
+        widget.rect = fitz.Rect(10, 10 + 30 * idx, 200, 30 + 30 * idx)
+        doc[page_number].add_widget(widget)
+    return fitz.open("pdf", doc.tobytes())
+
+
+def test_read_fields_matches_widget_api():
+    doc = make_filled_form()
+    assert sorted(read_fields(doc, with_pages=True)) == sorted(read_widgets(doc))
+    assert ("Declined", "Off", None) in read_fields(doc)
+
+
+def test_clear_fields_blanks_values_in_an_incremental_save(tmp_path):
+    path = tmp_path / "form.pdf"
+    make_filled_form().save(path)
+    size = path.stat().st_size
+
+    with fitz.open(path) as doc:
+        assert clear_fields(doc) == 4
+        doc.saveIncr()
+
+    assert path.stat().st_size > size
+    with fitz.open(path) as doc:
+        values = {name: value for name, value, _ in read_fields(doc)}
+    assert values == {"Employee Name": "", "Blank": "", "Approved": "Off", "Declined": "Off"}
+
+
+def test_fields_array_may_be_an_indirect_object():
+    doc = make_filled_form()
+    catalog = doc.pdf_catalog()
+    _, fields = doc.xref_get_key(catalog, "AcroForm/Fields")
+    xref = doc.get_new_xref()
+    doc.update_object(xref, fields)
+    doc.xref_set_key(catalog, "AcroForm/Fields", f"{xref} 0 R")
+    doc = fitz.open("pdf", doc.tobytes())
+
+    assert doc.xref_get_key(doc.pdf_catalog(), "AcroForm/Fields")[0] == "xref"
+    assert sorted(field_names(doc)) == ["Approved", "Blank", "Declined", "Employee Name"]
+    assert sorted(read_fields(doc, with_pages=True)) == sorted(read_widgets(doc))
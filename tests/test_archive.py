@@ -0,0 +1,83 @@
+import json
+
+from storage.archive import JsonlArchive
+
+
+def make_archive(tmp_path) -> JsonlArchive:
+    return JsonlArchive(
+        tmp_path / "archive.jsonl",
+        tmp_path / "archive.idx",
+        tmp_path / "archive.json",
+    )
+
+
+def test_append_lookup_and_compact(tmp_path):
+    legacy = {"25-IND-001": {"log_id": "25-IND-001", "employee_name": "Doe, Jane"}}
+    (tmp_path / "archive.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    archive = make_archive(tmp_path)
+    archive.append_many(
+        [
+            {"log_id": "25-IND-002", "employee_name": "Roe, Rick"},
+            {"log_id": "25-IND-001", "employee_name": "Doe, Jane A."},
+        ]
+    )
+
+    reopened = make_archive(tmp_path)
+    assert "25-IND-002" in reopened and "25-IND-003" not in reopened
+    assert reopened.get("25-IND-001")["employee_name"] == "Doe, Jane A."
+
+    compacted = json.loads(reopened.compact().read_text(encoding="utf-8"))
+    assert list(compacted) == ["25-IND-001", "25-IND-002"]
+
+
+def test_unindexed_tail_and_partial_line_are_recovered(tmp_path):
+    archive = make_archive(tmp_path)
+    archive.append({"log_id": "25-IND-001"})
+    with open(archive.path, "a", encoding="utf-8") as file:
+        file.write('{"log_id": "25-IND-002"}\n{"log_id": "25-IN')
+
+    reopened = make_archive(tmp_path)
+    assert "25-IND-002" in reopened
+    reopened.append({"log_id": "25-IND-003"})
+    assert make_archive(tmp_path).get("25-IND-003") == {"log_id": "25-IND-003"}
+
+
+def test_streaming_rewrite_drops_test_records_and_matches_legacy_format(tmp_path):
+    from storage.archive import iter_legacy_json
+    from storage.maintenance import drop_test_records, rewrite, strip_text
+
+    legacy = {
+        "25-IND-001": {"log_id": "25-IND-001", "employee_name": " Doe, Jane "},
+        "0b7c3f0e-test": {"log_id": "0b7c3f0e-test", "employee_name": "Test"},
+        "25-GRP-001": {"log_id": "25-GRP-001", "employees": {"1": {"name": "A"}}},
+    }
+    text = json.dumps(legacy, indent=4)
+    (tmp_path / "archive.json").write_text(text, encoding="utf-8")
+    assert dict(iter_legacy_json(tmp_path / "archive.json", chunk_size=7)) == legacy
+
+    archive = make_archive(tmp_path)
+    report = rewrite([drop_test_records, strip_text], archive)
+    assert (report.read, report.dropped, report.changed) == (3, 1, 1)
+
+    reopened = make_archive(tmp_path)
+    assert "0b7c3f0e-test" not in reopened
+    assert reopened.get("25-IND-001")["employee_name"] == "Doe, Jane"
+
+    del legacy["0b7c3f0e-test"]
+    legacy["25-IND-001"]["employee_name"] = "Doe, Jane"
+    compacted = reopened.compact(tmp_path / "out.json").read_text(encoding="utf-8")
+    assert compacted == json.dumps(legacy, indent=4)
+
+
+def test_applied_segment_updates_a_loaded_index(tmp_path):
+    archive = make_archive(tmp_path)
+    archive.append({"log_id": "25-IND-001"})
+    assert "25-IND-001" in archive
+
+    segment = tmp_path / "archive.jsonl.segment"
+    base_size = archive.stage([{"log_id": "25-IND-002", "value": "Moderate"}], segment)
+    archive.apply_segment(segment, base_size)
+
+    assert archive.get("25-IND-002")["value"] == "Moderate"
+    assert make_archive(tmp_path).offsets == archive.offsets
@@ -0,0 +1,13 @@
+from storage.extraction import ExtractionCache
+
+
+def test_cache_round_trip_is_scoped_to_extractor_version(tmp_path):
+    cache = ExtractionCache(tmp_path, version="1")
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, "IND", ("Employee Name",), {"employee_name": "Doe, Jane"})
+    assert cache.get("ab" * 32) == {
+        "route": "IND",
+        "field_names": ["Employee Name"],
+        "pdf_data": {"employee_name": "Doe, Jane"},
+    }
+    assert ExtractionCache(tmp_path, version="2").get("ab" * 32) is None
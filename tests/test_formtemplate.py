@@ -0,0 +1,36 @@
+from models.formtemplate import FormTemplate, GroupTemplate
+
+
+def test_template_plan_prefers_first_available_candidate():
+    template = FormTemplate.for_fields(
+        ["Employee Name", "Hours", "Hours 2", "Pay Plan Grade/Step", "Amount"]
+    )
+    pdf_data = {"employee_name": "Lee Bishop", "hours": "8", "hours_2": "9"}
+
+    assert template.keys["Hours 2"] == "hours_2"
+    assert template.plan["sas_time_off_amount"] == "hours_2"
+    assert template.plan["ots_time_off_amount"] == "hours"
+    assert template.plan["sas_monetary_amount"] == "amount"
+    assert template.plan["approver_name"] is None
+    assert template.value("employee_name", pdf_data) == "Lee Bishop"
+
+
+def test_templates_are_cached_by_field_name_set():
+    first = FormTemplate.for_fields(["org", "employee_name"])
+    second = FormTemplate.for_fields(["employee_name", "org", "org"])
+    assert first is second
+
+
+def test_group_template_assigns_each_employee_row_to_one_slot():
+    row_14 = ["2.employee_name_15", "2.organization_20", "2.award_amount_14"]
+    row_15 = ["3.employee_name_15", "3.organization_15", "3.award_amount_15"]
+    pdf_data = {key: key for key in row_14 + row_15 + ["0.please_print_3"]}
+    pdf_data["4.employee_name_40"] = "Unmapped"
+    template = GroupTemplate.for_keys(pdf_data)
+
+    rows = template.row_values(pdf_data)
+    assert [row["name"] for row in rows] == ["2.employee_name_15", "3.employee_name_15"]
+    assert rows[1]["monetary_amount"] == "3.award_amount_15"
+    assert rows[1]["pay_plan"] is None
+    assert template.value("approver_name", pdf_data) == "0.please_print_3"
+    assert template.unmatched == ("4.employee_name_40",)
@@ -0,0 +1,28 @@
+import fitz
+
+from models.formtriage import FormTriage
+
+
+def make_form(page_count: int, field_names: list[str]) -> fitz.Document:
+    doc = fitz.open()
+    for _ in range(page_count):
+        doc.new_page()
+    for idx, name in enumerate(field_names):
+        widget = fitz.Widget()
+        widget.field_name = name
+        widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+        widget.rect = fitz.Rect(10, 10 + 30 * idx, 200, 30 + 30 * idx)
+        doc[0].add_widget(widget)
+    return fitz.open("pdf", doc.tobytes())
+
+
+def test_triage_routes_by_page_count_and_field_names():
+    assert FormTriage(make_form(2, ["Employee Name", "Hours 2"])).route == FormTriage.IND
+    assert FormTriage(make_form(4, ["Group Name"])).route == FormTriage.GRP
+    assert FormTriage(make_form(2, ["Employee's Name"])).route == FormTriage.EXTERNAL
+
+
+def test_triage_rejects_forms_without_fields():
+    triage = FormTriage(make_form(2, []))
+    assert triage.route == FormTriage.REJECT
+    assert triage.reason == "No form fields found in the PDF."
@@ -0,0 +1,46 @@
+import pytest
+
+from models.formtriage import FormTriage
+from models.groupdetails import GrpProcessor, for_route
+from models.individualdetails import IndProcessor
+from pipeline.batch import BatchRunner
+
+
+def test_na90_group_form_routes_to_the_group_pipeline():
+    processor = IndProcessor()
+    processor.route = FormTriage.GRP
+    processor.pdf_data = {
+        "0.group_name": "Records Team",
+        "0.please_print": "Doe, Jane",
+        "0.org": "NA-90.1",
+        "0.please_print_3": "Roe, Rich",
+        "0.organization": "NA-90",
+        "3.extent_of_application": "Kept the records current.",
+        "0.hours_2": "On",
+        "1.high": "On",
+        "1.general": "On",
+        "1.employee_name_2": "Lee, Ann",
+        "1.organization_7": "NA-90.1",
+        "1.time_off_hours": "8",
+        "1.employee_name_3": "Kim, Bo",
+        "1.organization_8": "NA-90.2",
+        "1.time_off_hours_2": "8",
+    }
+
+    group = for_route(processor)
+    assert isinstance(group, GrpProcessor)
+    assert for_route(group) is group
+
+    group.normalize()
+    group.validate()
+    assert group.category == "GRP"
+    assert group.funding_org == "NA-90"
+    assert (group.monetary_amount, group.time_off_amount) == (0, 16)
+    assert [row[5] for row in group.tsv_items()] == ["Lee, Ann", "Kim, Bo"]
+
+
+@pytest.mark.usefixtures("isolated_partition")
+def test_runner_no_longer_skips_na90_files(tmp_path):
+    path = tmp_path / "NA-90 _ Records Team.pdf"
+    path.write_bytes(b"%PDF-1.7 group")
+    assert BatchRunner(tmp_path)._pending([path]) == [path]
@@ -0,0 +1,102 @@
+import pytest
+
+from constants import PathManager
+from models.individualdetails import IndProcessor
+from pipeline.batch import BatchRunner
+from storage.archive import JsonlArchive
+from storage.commit import BatchCommitter
+from storage.journal import AwardJournal
+from storage.pdfstore import ContentStore
+from storage.tsv import TsvWriter
+from utils import IDManager
+
+pytestmark = pytest.mark.usefixtures("isolated_partition")
+
+
+def make_award(tmp_path, name: str, log_id=None) -> IndProcessor:
+    source = tmp_path / f"{name}.pdf"
+    source.write_bytes(f"%PDF-1.7 {name}".encode())
+    award = IndProcessor(source)
+    award.log_id = log_id
+    award.category = "IND"
+    award.type = "Monetary"
+    award.funding_org = "MB"
+    award.employee_name = name.capitalize()
+    award.monetary_amount = 500
+    award.value = "Moderate"
+    award.extent = "Limited"
+    award.justification = "steady work"
+    return award
+
+
+def test_recover_finishes_committed_entries_and_rolls_back_the_rest(tmp_path):
+    IDManager.load_SN_data()
+    committed = make_award(tmp_path, "smith", IDManager.get("IND"))
+    interrupted = make_award(tmp_path, "jones", IDManager.get("IND"))
+    journal = AwardJournal()
+    for award in (committed, interrupted):
+        entry = award.journal_entry()
+        journal.begin(entry)
+        entry.renamed_path.parent.mkdir(parents=True, exist_ok=True)
+        award.source_path.rename(entry.renamed_path)
+    JsonlArchive().append(committed.json_record())
+
+    AwardJournal().recover()
+
+    assert journal.entries() == []
+    assert committed.log_id in TsvWriter()
+    assert IDManager.load_SN_data()["IND"] == 2
+    assert ContentStore(PathManager.file_archive_dir).resolve(
+        committed.journal_entry().archived_name
+    ).exists()
+    assert interrupted.source_path.exists()
+    assert interrupted.log_id not in JsonlArchive()
+    assert IDManager.get("IND") == interrupted.log_id
+
+
+def test_batch_commit_writes_every_store_once(tmp_path):
+    IDManager.load_SN_data()
+    committer = BatchCommitter(batch_size=2)
+    awards = [make_award(tmp_path, name) for name in ("smith", "jones")]
+    for award in awards:
+        committer.add(award)
+    assert committer.full
+
+    results = committer.flush()
+
+    assert [error for _, error in results] == [None, None]
+    assert [award.log_id for award in awards] == ["25-IND-001", "25-IND-002"]
+    assert list(JsonlArchive().offsets) == ["25-IND-001", "25-IND-002"]
+    assert all(award.log_id in TsvWriter() for award in awards)
+    assert IDManager.load_SN_data()["IND"] == 3
+    assert not committer.marker_path.exists()
+    assert AwardJournal().entries() == []
+    assert not any(award.source_path.exists() for award in awards)
+
+
+def test_runner_skips_files_of_open_entries(tmp_path):
+    IDManager.load_SN_data()
+    award = make_award(tmp_path, "smith", IDManager.get("IND"))
+    entry = award.journal_entry()
+    AwardJournal().begin(entry)
+    other = tmp_path / "other.pdf"
+    other.write_bytes(b"%PDF-1.7 other")
+
+    runner = BatchRunner(tmp_path)
+
+    assert runner._pending([award.source_path, entry.renamed_path, other]) == [other]
+
+
+def test_failed_journal_entry_releases_the_log_id(tmp_path, monkeypatch):
+    IDManager.load_SN_data()
+    award = make_award(tmp_path, "smith")
+
+    def unwritable(journal, entry):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(AwardJournal, "begin", unwritable)
+    with pytest.raises(OSError):
+        award.commit()
+
+    assert award.log_id is None
+    assert IDManager.get("IND") == "25-IND-001"
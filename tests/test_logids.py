@@ -0,0 +1,50 @@
+import pytest
+
+from constants import PathManager
+from storage.archive import JsonlArchive
+from storage.logids import LogIdRegistry
+
+
+@pytest.fixture(autouse=True)
+def isolated_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(PathManager, "jsonl_archive_path", tmp_path / "archive.jsonl")
+    monkeypatch.setattr(PathManager, "jsonl_index_path", tmp_path / "archive.idx")
+    monkeypatch.setattr(PathManager, "json_archive_path", tmp_path / "legacy.json")
+
+
+def test_registry_seeds_from_archive_and_skips_issued_serials(tmp_path):
+    JsonlArchive().append_many(
+        [{"log_id": "25-IND-005"}, {"log_id": "25-IND-006"}, {"log_id": "24-IND-007"}]
+    )
+    registry = LogIdRegistry(tmp_path / "log_ids.txt", fiscal_year=2025)
+
+    assert "25-IND-006" in registry and "24-IND-007" not in registry
+    assert registry.issue("IND", floor=5) == "25-IND-007"
+    assert registry.issue("IND", floor=5) == "25-IND-008"
+    assert registry.issue("GRP", floor=3) == "25-GRP-003"
+
+    reloaded = LogIdRegistry(tmp_path / "log_ids.txt", fiscal_year=2025)
+    assert reloaded.next_serial("IND", floor=5) == 9
+
+
+def test_concurrent_registries_reserve_disjoint_blocks_and_reuse_released(tmp_path):
+    path = tmp_path / "log_ids.txt"
+    first = LogIdRegistry(path, fiscal_year=2025)
+    second = LogIdRegistry(path, fiscal_year=2025)
+
+    block = first.reserve("IND", count=3)
+    assert block == ["25-IND-001", "25-IND-002", "25-IND-003"]
+    assert second.reserve("IND", count=2) == ["25-IND-004", "25-IND-005"]
+
+    first.release(block[1:])
+    assert second.issue("IND") == "25-IND-002"
+    assert first.issue("IND") == "25-IND-003"
+
+
+def test_registry_defaults_to_the_current_fiscal_year(tmp_path, monkeypatch):
+    monkeypatch.setattr(PathManager, "fiscal_year", 2025)
+    JsonlArchive().append_many([{"log_id": "25-IND-001"}, {"log_id": "25-IND-002"}])
+    path = tmp_path / "log_ids.txt"
+
+    assert LogIdRegistry(path).issue("IND") == "25-IND-003"
+    assert LogIdRegistry(path).issue("IND") == "25-IND-004"
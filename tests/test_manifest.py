@@ -0,0 +1,51 @@
+import os
+
+from pipeline.manifest import ProcessingManifest
+
+
+def test_manifest_remembers_outcomes(tmp_path):
+    pdf_path = tmp_path / "award.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7 award")
+    manifest_path = tmp_path / "_manifest.json"
+
+    manifest = ProcessingManifest(manifest_path)
+    fingerprint = manifest.fingerprint(pdf_path)
+    assert not manifest.is_done(fingerprint)
+    manifest.record(fingerprint, ProcessingManifest.FAILED, error="Missing Fields")
+    manifest.save()
+
+    reloaded = ProcessingManifest(manifest_path)
+    assert reloaded.is_done(reloaded.fingerprint(pdf_path))
+    assert not ProcessingManifest(manifest_path, retry_failed=True).is_done(
+        reloaded.fingerprint(pdf_path)
+    )
+
+
+def test_manifest_detects_modified_and_renamed_files(tmp_path):
+    pdf_path = tmp_path / "award.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7 award")
+    manifest = ProcessingManifest(tmp_path / "_manifest.json")
+    manifest.record(
+        manifest.fingerprint(pdf_path), ProcessingManifest.PROCESSED, log_id="25-IND-001"
+    )
+
+    renamed_path = pdf_path.rename(tmp_path / "resubmitted.pdf")
+    assert manifest.is_done(manifest.fingerprint(renamed_path))
+
+    renamed_path.write_bytes(b"%PDF-1.7 corrected award")
+    os.utime(renamed_path, ns=(0, 0))
+    assert not manifest.is_done(manifest.fingerprint(renamed_path))
+
+
+def test_new_files_can_defer_their_hash(tmp_path):
+    pdf_path = tmp_path / "award.pdf"
+    pdf_path.write_bytes(b"%PDF-1.7 award")
+    manifest = ProcessingManifest(tmp_path / "_manifest.json")
+
+    fingerprint = manifest.fingerprint(pdf_path, hash_new=False)
+    assert fingerprint.sha256 is None and not manifest.is_done(fingerprint)
+
+    fingerprint.sha256 = manifest.fingerprint(pdf_path).sha256
+    manifest.record(fingerprint, ProcessingManifest.SKIPPED)
+    assert manifest.fingerprint(pdf_path, hash_new=False).sha256 == fingerprint.sha256
+    assert not manifest.is_done(fingerprint)
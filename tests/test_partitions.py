@@ -0,0 +1,52 @@
+import json
+from datetime import date
+
+import pytest
+
+from constants import AwardTracker, PathManager
+from storage.partitions import MergedArchive, migrate_flat_layout
+from storage.tracker import TrackerExporter
+
+pytestmark = pytest.mark.usefixtures("isolated_partition")
+
+
+def test_flat_layout_is_split_by_fiscal_year_and_merged_for_reads(tmp_path):
+    legacy = {
+        "24-IND-010": {"log_id": "24-IND-010"},
+        "25-IND-001": {"log_id": "25-IND-001"},
+    }
+    (tmp_path / "_output_JSON.json").write_text(json.dumps(legacy), encoding="utf-8")
+    (tmp_path / "_serial_numbers.yaml").write_text("IND: 2\nGRP: 1\n")
+
+    migrate_flat_layout()
+    assert PathManager.serial_path.read_text() == "IND: 2\nGRP: 1\n"
+    assert (tmp_path / "_output_JSON.json.migrated").exists()
+
+    merged = MergedArchive()
+    assert sorted(merged.archives) == [2024, 2025]
+    assert merged.get("24-IND-010") == {"log_id": "24-IND-010"}
+    assert "24-IND-010" not in merged.archives[2025]
+    assert [record["log_id"] for record in merged.records()] == list(legacy)
+
+
+def test_rollover_switches_partitions_on_october_first():
+    assert not PathManager.rollover(date(2025, 9, 30))
+    assert PathManager.rollover(date(2025, 10, 1))
+    assert PathManager.fiscal_year == 2026
+    assert PathManager.jsonl_archive_path.parent.name == "FY 2026"
+    assert str(AwardTracker.file_path).endswith("FY 2026 _ Special Act Awards Log.xlsm")
+
+
+def test_tracker_exporter_moves_to_the_new_year_at_rollover():
+    exporter = TrackerExporter()
+    exporter.add("25-IND-001", [["25-IND-001", "2025-09-30"]])
+    with pytest.raises(FileNotFoundError):
+        exporter.flush()
+    old_pending = PathManager.tracker_pending_path
+
+    PathManager.rollover(date(2025, 10, 1))
+
+    assert exporter.workbook_path == AwardTracker.file_path
+    assert exporter.flush() == 0
+    assert json.loads(old_pending.read_text())["25-IND-001"][0][0] == "25-IND-001"
+    assert exporter.pending_path.parent.name == "FY 2026"
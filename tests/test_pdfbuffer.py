@@ -0,0 +1,23 @@
+import hashlib
+
+import fitz
+
+from storage.pdfbuffer import PdfBuffer
+
+
+def test_buffer_is_read_once_and_reused(tmp_path):
+    doc = fitz.open()
+    doc.new_page()
+    doc.new_page()
+    source = tmp_path / "award.pdf"
+    doc.save(source)
+
+    buffer = PdfBuffer.read(source)
+    assert buffer.sha256 == hashlib.sha256(source.read_bytes()).hexdigest()
+    with buffer.open() as opened:
+        assert opened.page_count == 2
+
+    target = tmp_path / "archive.pdf"
+    buffer.write_to(target)
+    assert target.read_bytes() == source.read_bytes()
+    assert target.stat().st_mtime_ns == source.stat().st_mtime_ns
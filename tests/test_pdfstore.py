@@ -0,0 +1,59 @@
+from storage.pdfstore import ContentStore, file_sha256
+
+
+def test_identical_pdfs_are_stored_once_under_every_name(tmp_path):
+    source = tmp_path / "source.pdf"
+    source.write_bytes(b"%PDF-1.7 nomination")
+    digest, size = file_sha256(source), source.stat().st_size
+    store = ContentStore(tmp_path / "archive")
+    writes = []
+
+    def write(path):
+        writes.append(path)
+        path.write_bytes(source.read_bytes())
+
+    first = store.put("25-IND-001 _ NA-1 _ Doe _ 2025-01-02.pdf", digest, size, write)
+    second = store.put("25-IND-007 _ NA-1 _ Doe _ 2025-03-04.pdf", digest, size, write)
+
+    assert first == second == store.object_path(digest)
+    assert len(writes) == 1
+    assert store.resolve("25-IND-007 _ NA-1 _ Doe _ 2025-03-04.pdf") == first
+    assert (tmp_path / "archive" / "25-IND-001 _ NA-1 _ Doe _ 2025-01-02.pdf").exists()
+    assert len(store.names()) == 2
+
+
+def test_import_existing_collapses_duplicate_files(tmp_path):
+    store = ContentStore(tmp_path)
+    (tmp_path / "a.pdf").write_bytes(b"same")
+    (tmp_path / "b.pdf").write_bytes(b"same")
+
+    assert store.import_existing() == 2
+    assert len(list(store.objects_dir.rglob("*.pdf"))) == 1
+    assert store.resolve("a.pdf") == store.resolve("b.pdf")
+    assert (tmp_path / "b.pdf").read_bytes() == b"same"
+
+
+def test_names_resolve_through_the_index_where_hard_links_fail(tmp_path, monkeypatch):
+    def refuse(*args):
+        raise OSError("links not supported")
+
+    monkeypatch.setattr("storage.pdfstore.os.link", refuse)
+    store = ContentStore(tmp_path)
+    (tmp_path / "a.pdf").write_bytes(b"plain")
+    (tmp_path / "b.pdf").write_bytes(b"plain")
+
+    assert store.import_existing() == 2
+    assert list(tmp_path.glob("*.pdf")) == []
+    assert store.resolve("b.pdf") == store.resolve("a.pdf")
+    assert store.resolve("a.pdf").read_bytes() == b"plain"
+
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"%PDF-1.7 new")
+    store.put(
+        "c.pdf",
+        file_sha256(source),
+        source.stat().st_size,
+        lambda path: path.write_bytes(source.read_bytes()),
+    )
+    assert not (tmp_path / "c.pdf").exists()
+    assert store.resolve("c.pdf").read_bytes() == b"%PDF-1.7 new"
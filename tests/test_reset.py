@@ -0,0 +1,21 @@
+import fitz
+
+from tests.test_acroform import make_filled_form
+from z import File
+
+
+def test_reset_appends_to_the_original_bytes(tmp_path):
+    path = tmp_path / "form.pdf"
+    make_filled_form().save(path)
+    original = path.read_bytes()
+
+    file = File(path, tmp_path / "IND_1.pdf")
+    assert file.is_ind_file()
+    assert file.reset() == 4
+
+    reset = file.new_path.read_bytes()
+    assert len(reset) > len(original)
+    assert reset.startswith(original)
+    assert path.read_bytes() == original
+    with fitz.open(file.new_path) as doc:
+        assert {widget.field_value for page in doc for widget in page.widgets()} == {"", "Off"}
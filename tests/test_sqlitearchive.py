@@ -0,0 +1,50 @@
+import json
+
+from storage.archive import JsonlArchive
+from storage.sqlitearchive import SqliteArchive
+
+
+def test_sync_imports_only_new_records_and_queries_group_members(tmp_path):
+    archive = JsonlArchive(
+        tmp_path / "archive.jsonl", tmp_path / "archive.idx", tmp_path / "legacy.json"
+    )
+    archive.append(
+        {
+            "log_id": "25-IND-001",
+            "employee_name": "Doe, Jane",
+            "funding_org": "NA-10",
+            "consultant": "Smith",
+        }
+    )
+
+    with SqliteArchive(tmp_path / "archive.sqlite3") as store:
+        assert store.sync(archive) == 1
+        archive.append(
+            {
+                "log_id": "25-GRP-001",
+                "group_name": "Safety Team",
+                "funding_org": "NA-10",
+                "date_received": "2025-03-01",
+                "employees": {"1": {"name": "Roe, Rick"}},
+            }
+        )
+        assert store.sync(archive) == 1
+        assert store.sync(archive) == 0
+
+        assert "25-GRP-001" in store and len(store) == 2
+        assert [r["log_id"] for r in store.find(funding_org="NA-10")] == [
+            "25-GRP-001",
+            "25-IND-001",
+        ]
+        assert store.find(employee_name="Roe, Rick")[0]["group_name"] == "Safety Team"
+        assert store.find(received_from="2025-01-01") == [store.get("25-GRP-001")]
+        assert store.find(consultant=None) == [store.get("25-GRP-001")]
+        assert store.find(consultant="Smith") == [store.get("25-IND-001")]
+
+
+def test_import_json_loads_the_legacy_archive(tmp_path):
+    legacy = {"25-IND-001": {"log_id": "25-IND-001", "employee_name": "Doe, Jane"}}
+    (tmp_path / "legacy.json").write_text(json.dumps(legacy), encoding="utf-8")
+    with SqliteArchive(tmp_path / "archive.sqlite3") as store:
+        assert store.import_json(tmp_path / "legacy.json") == 1
+        assert store.get("25-IND-001") == legacy["25-IND-001"]
@@ -0,0 +1,22 @@
+import time
+
+from pipeline.stages import Pipeline, Stage
+
+
+def _double(value: int) -> int:
+    time.sleep((value % 3) / 1000)
+    if value == 3:
+        raise ValueError("unreadable form")
+    return value * 2
+
+
+def test_pipeline_preserves_order_and_reports_errors():
+    pipeline = Pipeline(
+        [Stage("double", _double, workers=4), Stage("increment", lambda v: v + 1)],
+        queue_size=2,
+    )
+    results = list(pipeline.run(range(20)))
+
+    assert [item for item, _, _ in results] == list(range(20))
+    assert results[2] == (2, 5, None)
+    assert results[3] == (3, None, "unreadable form")
@@ -0,0 +1,74 @@
+from storage.archive import JsonlArchive
+from storage.tsv import TSV_COLUMNS, TsvWriter, rows_from_record
+
+
+def test_writer_skips_duplicate_log_ids_and_regenerates_from_archive(tmp_path):
+    path = tmp_path / "out.txt"
+    path.write_text("25-IND-001\tfull justification\n", encoding="utf-8")
+    writer = TsvWriter(path)
+
+    assert not writer.add("25-IND-001", "25-IND-001\tagain")
+    assert writer.add("25-GRP-001", "25-GRP-001\tA\n25-GRP-001\tB")
+    assert not writer.add("25-GRP-001", "25-GRP-001\tC")
+    assert writer.flush() == 1
+    assert "25-GRP-001" in TsvWriter(path)
+
+    group = {
+        "log_id": "25-GRP-001",
+        "group_name": "Team",
+        "employees": {"1": {"name": "A"}, "2": {"name": "B"}},
+    }
+    rows = rows_from_record(group)
+    assert len(rows) == 2 and len(rows[0].split("\t")) == len(TSV_COLUMNS)
+
+    archive = JsonlArchive(tmp_path / "a.jsonl", tmp_path / "a.idx", tmp_path / "a.json")
+    archive.append_many([{"log_id": "25-IND-002"}, group, {"log_id": "25-IND-001"}])
+    assert TsvWriter(path).regenerate(archive) == 3
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [line.split("\t")[0] for line in lines] == [
+        "25-IND-002",
+        "25-GRP-001",
+        "25-GRP-001",
+        "25-IND-001",
+    ]
+    assert lines[1:] == ["25-GRP-001\tA", "25-GRP-001\tB", "25-IND-001\tfull justification"]
+
+
+def test_multi_line_justifications_stay_in_their_row(tmp_path):
+    path = tmp_path / "out.txt"
+    justification = '"> First paragraph.\n> Second paragraph."'
+    path.write_text(
+        f"25-IND-001\tA\t{justification}\tvalue\textent\n"
+        f"25-GRP-001\tB\t{justification}\tv\te\n"
+        f"25-GRP-001\tC\t{justification}\tv\te\n",
+        encoding="utf-8",
+    )
+    writer = TsvWriter(path)
+    assert set(writer.blocks) == {"25-IND-001", "25-GRP-001"}
+
+    assert writer.add("25-IND-002", f"25-IND-002\tD\t{justification}\tv\te")
+    writer.flush()
+    assert set(TsvWriter(path).blocks) == {"25-IND-001", "25-GRP-001", "25-IND-002"}
+
+    archive = JsonlArchive(tmp_path / "a.jsonl", tmp_path / "a.idx", tmp_path / "a.json")
+    archive.append_many([{"log_id": "25-IND-002"}, {"log_id": "25-IND-001"}])
+    TsvWriter(path).regenerate(archive)
+    assert path.read_text(encoding="utf-8") == (
+        f"25-IND-002\tD\t{justification}\tv\te\n"
+        f"25-IND-001\tA\t{justification}\tvalue\textent\n"
+    )
+
+
+def test_applied_segment_updates_loaded_blocks(tmp_path):
+    path = tmp_path / "out.txt"
+    path.write_text("25-IND-001\tA\n", encoding="utf-8")
+    writer = TsvWriter(path)
+    assert "25-IND-001" in writer
+
+    writer.add("25-IND-002", '25-IND-002\t"> One.\n> Two."\tv')
+    segment = tmp_path / "out.txt.segment"
+    writer.apply_segment(segment, writer.stage(segment))
+
+    assert "25-IND-002" in writer
+    assert writer.blocks == TsvWriter(path).blocks
@@ -1,37 +1,45 @@
 import json
 import re
-import warnings
 from datetime import date, datetime, timedelta
-from time import sleep
+from functools import lru_cache
 from typing import Optional
 from uuid import uuid4
 
-import openpyxl
 import yaml
 
-from formatting.formatter import Formatter
-
-from .constants import (
+from constants import (
     CONSULTANT_MAP,
-    AwardTracker,
+    ORGANIZATION_DIVISIONS,
     PathManager,
     current_fiscal_year,
-    division_structure,
     mb_map,
+    sqlite_archive,
     testing_mode,
 )
-from .logger import Logger
+from formatting.formatter import Formatter
+from logger import Logger
+from storage.archive import JsonlArchive
+from storage.logids import LogIdRegistry
+from storage.maintenance import Rule, drop_test_records, rewrite
+from storage.partitions import MergedArchive, ensure_current_partition
+from storage.sqlitearchive import SqliteArchive
 
 logger = Logger()
 formatter = Formatter()
 
 
 class IDManager:
+    _registry: Optional[LogIdRegistry] = None
+
     @staticmethod
     def load_SN_data() -> dict[str, int]:
         try:
             if not PathManager.serial_path.exists():
-                raise ValueError(f"Log ID file not found: {PathManager.serial_path}")
+                # A new fiscal year's partition starts its serials over.
+                PathManager.serial_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(PathManager.serial_path, "w") as file:
+                    yaml.safe_dump({"IND": 1, "GRP": 1}, file, indent=4, sort_keys=False)
+                logger.info(f"Started FY {PathManager.fiscal_year} serial numbers.")
 
             with open(PathManager.serial_path, "r") as file:
 
@@ -54,58 +62,79 @@ class IDManager:
             raise ValueError(f"Unable to load Log ID data. {e}")
 
     @staticmethod
-    def load_archive() -> dict[str, dict[str, str | int | None]]:
+    def load_archive() -> JsonlArchive:
         try:
-            with open(PathManager.json_archive_path, "r", encoding="utf-8") as file:
-                content: str = file.read().strip()
-                content = r"{}" if not content else content
-                json_data: dict[str, dict[str, str | int | None]] = json.loads(content)
-            return json_data
+            return JsonlArchive()
         except Exception as e:
             raise ValueError(
-                f"Unable to load archived JSON data from {PathManager.json_archive_path.name}. {e}"
+                f"Unable to load archived JSON data from {PathManager.jsonl_archive_path.name}. {e}"
             )
 
+    @staticmethod
+    def registry() -> LogIdRegistry:
+        """The current fiscal year's issued-ID registry, loaded once per process."""
+        registry = IDManager._registry
+        if registry is None or registry.fiscal_year != PathManager.fiscal_year:
+            IDManager._registry = LogIdRegistry()
+        return IDManager._registry
+
     @staticmethod
     def get(category: str) -> int:
         """
-        Retrieves the log ID from the JSON file formatted as {fiscal_year}-{category}-{serial_number}.
+        Issues the next free log ID formatted as {fiscal_year}-{category}-{serial_number}.
         """
         if testing_mode:
             return str(uuid4())
 
-        archive_data = IDManager.load_archive()
         SN_data = IDManager.load_SN_data()
-        fy_str: str = str(current_fiscal_year)[-2:]
         target_ser_num = SN_data.get(str(category))
         if target_ser_num is None:
             raise ValueError(f"Data not found for category: {category}")
-        while True:
-            log_id: str = f"{fy_str}-{category}-{str(target_ser_num).zfill(3)}"
-            if archive_data.get(log_id) is None:
-                break
-            else:
-                logger.warning(f"Duplicate found for {log_id}")
-                target_ser_num += 1
-
-        if target_ser_num != SN_data[category]:
-            IDManager.update(category=category, new_value=target_ser_num)
+        return IDManager.registry().issue(category, floor=target_ser_num)
 
-        return log_id
+    @staticmethod
+    def release(log_id: str) -> None:
+        """Returns an issued log ID whose award was never saved."""
+        if testing_mode:
+            return
+        IDManager.registry().release([log_id])
 
     @staticmethod
     def update(category: str, new_value: Optional[int] = None) -> None:
         if testing_mode:
             return
 
-        serial_numbers = IDManager.load_SN_data()
-        if new_value is None:
-            serial_numbers[category] += 1
-        else:
-            serial_numbers[category] = new_value
+        registry = IDManager.registry()
+        with registry.lock:
+            serial_numbers = IDManager.load_SN_data()
+            if new_value is None:
+                # The registry may have skipped serials that were already issued.
+                issued_next = registry.next_serial(category)
+                serial_numbers[category] = max(serial_numbers[category] + 1, issued_next)
+            else:
+                serial_numbers[category] = new_value
 
-        with open(PathManager.serial_path, "w") as file:
-            yaml.safe_dump(serial_numbers, file, indent=4, sort_keys=False)
+            with open(PathManager.serial_path, "w") as file:
+                yaml.safe_dump(serial_numbers, file, indent=4, sort_keys=False)
+
+
+@lru_cache(maxsize=1)
+def org_index() -> tuple[tuple, ...]:
+    """
+    Standardized organization and division names, computed once per process.
+    """
+    index = []
+    for target_org, div_list in ORGANIZATION_DIVISIONS.items():
+        field: Optional[str] = None
+        formatted_org: str = formatter.standardized_org_div(target_org)
+        if len(formatted_org.split(" ")) == 2:
+            formatted_org, field = (part.strip() for part in formatted_org.split(" "))
+        formatted_divs = tuple(
+            (target_div, formatter.standardized_org_div(target_div))
+            for target_div in reversed(div_list)
+        )
+        index.append((target_org, formatted_org, field, formatted_divs))
+    return tuple(index)
 
 
 def find_organization(input_org: str) -> tuple[Optional[str], Optional[str]]:
@@ -131,17 +160,11 @@ def find_organization(input_org: str) -> tuple[Optional[str], Optional[str]]:
 
     formatted_input = formatter.standardized_org_div(input_org)
 
-    for target_org, div_list in division_structure.items():
-        field: Optional[str] = None
-        formatted_org: str = formatter.standardized_org_div(target_org)
-        if len(formatted_org.split(" ")) == 2:
-            formatted_org, field = (part.strip() for part in formatted_org.split(" "))
+    for target_org, formatted_org, field, formatted_divs in org_index():
         if org_match is None and is_org_match(formatted_org, field, formatted_input):
             org_match = target_org
 
-        div_list = list(reversed(div_list))
-        for target_div in div_list:
-            formatted_div = formatter.standardized_org_div(target_div)
+        for target_div, formatted_div in formatted_divs:
             if div_match is None and is_div_match(formatted_div, formatted_input):
                 org_match = target_org
                 div_match = target_div
@@ -156,65 +179,29 @@ def find_mgmt_division(input_org: str) -> str:
     if not input_org:
         return
 
-    formatted_input = Formatter(input_org).standardized_org_div()
+    formatted_input = formatter.standardized_org_div(input_org)
 
     for org, div_list in mb_map.items():
-        formatted_org = Formatter(org).standardized_org_div()
+        formatted_org = formatter.standardized_org_div(org)
 
         if formatted_org in formatted_input:
             return org
 
         for div in div_list:
-            formatted_div = Formatter(div).standardized_org_div()
+            formatted_div = formatter.standardized_org_div(div)
 
             if formatted_div in formatted_input:
                 return org
     return None
 
 
-def update_serial_numbers():
-
-    warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
-
-    try:
-        path = AwardTracker.file_path.absolute()
-        wb = openpyxl.load_workbook(path, data_only=True)
-        sheet = wb[AwardTracker.sheet_name]
-        xl_ind_val: int = int(sheet[AwardTracker.ind_coord].value[-3:])
-        xl_grp_val: int = int(sheet[AwardTracker.grp_coord].value[-3:])
-
-        with open(PathManager.serial_path, "r", encoding="utf-8") as file:
-            data = yaml.safe_load(file)
-            yaml_ind_val = data["IND"]
-            yaml_grp_val = data["GRP"]
-
-        yaml_ind_val = xl_ind_val if xl_ind_val > yaml_ind_val else yaml_ind_val
-        yaml_grp_val = xl_grp_val if xl_grp_val > yaml_grp_val else yaml_grp_val
-
-        with open(PathManager.serial_path, "w", encoding="utf-8") as file:
-            yaml.safe_dump(data, file, indent=4, sort_keys=False, encoding="utf-8")
-
-            print(
-                f"\n"
-                "Updated serial_numbers.yaml\n"
-                f"IND: {yaml_ind_val}\n"
-                f"GRP: {yaml_grp_val}\n"
-            )
-
-    except Exception as e:
-        print(f"Unable to update serial_numbers.yaml. {e}")
-
-    warnings.resetwarnings()
-    sleep(3)
-
-
 class ManualEntry:
     @staticmethod
     def load() -> dict[str, str]:
         with open(PathManager.manual_entry_path, "r") as file:
             try:
                 data: dict = yaml.safe_load(file)
-                return {k: Formatter(v).value() for k, v in data.items()}
+                return {k: formatter.clean(v) for k, v in data.items()}
             except Exception as e:
                 print(e)
 
@@ -252,35 +239,33 @@ class ManualEntry:
             print(e)
 
 
-def clean_JSON_output():
-    import json
-
-    try:
-        with open(PathManager.json_archive_path, "r", encoding="utf-8") as jfile:
-            json_data: dict[str, dict[str | int | None]] = json.load(jfile)
-            initial_count: int = len(json_data)
-
-            keys = [key for key in json_data if len(key) > 10]
-            for key in keys:
-                json_data.pop(key)
-
-        final_count: int = len(json_data)
+def rederive_orgs(record: dict) -> dict:
+    """Maintenance rule: matches the archived org fields against the current org list."""
+    record = dict(record)
+    for key in ["nominator_org", "certifier_org", "approver_org", "employee_org"]:
+        if record.get(key):
+            org_match, div_match = find_organization(record[key])
+            record[key] = (div_match if div_match else org_match) or record[key]
+    if record.get("funding_org"):
+        org_match, _ = find_organization(record["funding_org"])
+        record["funding_org"] = org_match or record["funding_org"]
+    return record
 
-        items_removed: int = initial_count - final_count
 
-        with open(PathManager.json_archive_path, "w", encoding="utf-8") as jfile:
-            json.dump(json_data, jfile, indent=4, sort_keys=False)
-            print(
-                f"\ninitial count: {initial_count}\n"
-                f"items removed: {items_removed}\n"
-                f"final count: {final_count}"
-            )
+def clean_JSON_output(rules: Optional[list[Rule]] = None):
+    """Removes testing-mode records (and applies any extra rules) in one streaming pass."""
+    try:
+        report = rewrite([drop_test_records, *(rules or [])])
+        if sqlite_archive and (report.dropped or report.changed):
+            with SqliteArchive() as store:
+                store.rebuild()
+        print(f"\n{report}")
     except Exception as e:
         print(e)
 
 
 class DateHandler:
-    current_fy: int = 2025
+    current_fy: int = current_fiscal_year
     fy_end_date = datetime(current_fy, 9, 30)
     next_fy = current_fy + 1
 
@@ -348,9 +333,9 @@ class DateHandler:
 
 
 class Archive:
-    data: dict[str, dict[str, str]] = {}
     sorted_data: dict[str, dict[str, str]] = {}
     hrc: Optional[str] = None
+    store: Optional[SqliteArchive | MergedArchive] = None
 
     def __init__(self):
         self.load()
@@ -382,9 +367,20 @@ class Archive:
         while True:
             print("Enter a Log ID.")
             log_id: str = input("> ").strip()
-            id_data = self.data.get(log_id)
+            id_data = self.store.get(log_id)
             if id_data:
-                self.sorted_data = self.data[id_data]
+                self.sorted_data = id_data
+                return
+
+    def hrc_awards(self) -> list[dict[str, str]]:
+        """Awards assigned to the selected HR consultant."""
+        if isinstance(self.store, SqliteArchive):
+            return self.store.find(consultant=self.hrc)
+        return [
+            award
+            for award in self.store.records()
+            if award.get("consultant") == self.hrc
+        ]
 
     def get_date_received(self):
         while True:
@@ -398,8 +394,16 @@ class Archive:
                 print(f"Invalid input. {e}")
 
     def load(self):
-        with open(PathManager.json_archive_path, "r", encoding="utf-8") as jf:
-            self.data = json.load(jf)
+        """
+        Opens the archive for lookups; records are read on demand, not up front.
+        Without SQLite, every fiscal year is searchable through the merged view.
+        """
+        ensure_current_partition()
+        if sqlite_archive:
+            self.store = SqliteArchive()
+            self.store.sync()
+            return
+        self.store = MergedArchive()
 
 
 if __name__ == "__main__":
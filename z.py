@@ -1,9 +1,14 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 import fitz
 
 from formatting.formatter import Formatter
+from models.acroform import clear_fields
+from storage.pdfbuffer import PdfBuffer
 
 formatter = Formatter()
 from rich.traceback import install
@@ -13,6 +18,7 @@ install(show_locals=True, width=150)
 @dataclass
 class File:
     path: Path
+    new_path: Optional[Path] = None
 
     def __post_init__(self):
         try:
@@ -23,49 +29,92 @@ class File:
             raise FileNotFoundError(f"Path {self.path} does not exist.")
         if not self.path.is_file():
             raise ValueError(f"Path {self.path} is not a file.")
-        self.new_path = self.generate_path()
+        if self.new_path is None:
+            self.new_path = self.generate_path(self.path)
+        self.buffer: Optional[PdfBuffer] = None
+        self.doc: Optional[fitz.Document] = None
+
+    def open(self) -> fitz.Document:
+        """Reads the file once and keeps the document open for every later step."""
+        if self.doc is None:
+            self.buffer = PdfBuffer.read(self.path)
+            self.doc = self.buffer.open()
+        return self.doc
+
+    def close(self) -> None:
+        if self.doc is not None:
+            self.doc.close()
+            self.doc = None
 
     def is_ind_file(self):
-        with fitz.open(self.path) as doc:
-            return doc.page_count == 2
-
-    def reset(self):
-        with fitz.open(self.path) as doc:
-            for page in doc:
-                for field in page.widgets():
-                    try:
-                        widget = page.load_widget(field.xref)
-                        widget.field_value = ""
-                        widget.update()
-                    except:
-                        pass
-            doc.save(self.new_path)
-
-    def generate_path(self) -> Path:
+        return self.open().page_count == 2
+
+    def reset(self) -> int:
+        """
+        Writes the bytes already read to new_path and blanks its fields in an
+        incremental save, so the original PDF is kept as-is and only the field
+        changes are appended. A file that cannot take an incremental save
+        (e.g. one that needed repair) gets a full save instead.
+        """
+        self.open()
+        self.close()
+        self.buffer.write_to(self.new_path)
+        temp_path = self.new_path.with_suffix(".tmp")
+        with fitz.open(self.new_path) as doc:
+            count = clear_fields(doc)
+            if doc.can_save_incrementally():
+                doc.saveIncr()
+            else:
+                doc.save(temp_path)
+        if temp_path.exists():
+            os.replace(temp_path, self.new_path)
+        return count
+
+    @staticmethod
+    def generate_path(path: Path, reserved: Optional[set[Path]] = None) -> Path:
+        reserved = reserved if reserved is not None else set()
         counter = 1
         stem = f"IND_{counter}"
-        new_path = self.path.with_stem(stem)
-        while new_path.exists():
+        new_path = path.with_stem(stem)
+        while new_path.exists() or new_path in reserved:
             counter += 1
             stem = f"IND_{counter}"
-            new_path = self.path.with_stem(stem)
+            new_path = path.with_stem(stem)
         return new_path
 
 
-def main():
-    print("\n\nDeleting and resetting files...\n\n")
-    folder: Path = Path("/Users/Joey/Downloads/SAS Forms")
-    for file_path in folder.iterdir():
-        if file_path.suffix != ".pdf":
-            continue
-        file = File(file_path)
+def reset_file(path: Path, new_path: Path) -> str:
+    """Worker: opens the PDF once, then either deletes it or writes a blank template."""
+    try:
+        file = File(path, new_path)
         if not file.is_ind_file():
-            print(f"Deleting {file.path}")
-            file_path.unlink()
-        else:
-            print(f"Resetting {file.path}")
-            file.reset()
-            print(f"Renamed to {file.new_path.name}")
+            file.close()
+            path.unlink()
+            return f"Deleted {path.name}"
+        count = file.reset()
+        return f"Reset {path.name} ({count} fields) -> {new_path.name}"
+    except Exception as e:
+        return f"Failed {path.name}: {e}"
+
+
+def main(
+    folder: Path = Path("/Users/Joey/Downloads/SAS Forms"),
+    workers: Optional[int] = None,
+):
+    print("\n\nDeleting and resetting files...\n\n")
+    paths: list[Path] = sorted(p for p in folder.iterdir() if p.suffix == ".pdf")
+    # Output names are reserved up front so parallel workers never pick the same one.
+    reserved: set[Path] = set()
+    new_paths: list[Path] = []
+    for path in paths:
+        new_path = File.generate_path(path, reserved)
+        reserved.add(new_path)
+        new_paths.append(new_path)
+
+    workers = min(workers or os.cpu_count() or 1, max(len(paths), 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(reset_file, paths, new_paths):
+            print(result)
     print("\n\nDone.\n\n")
 
 